@@ -1,64 +1,115 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from app.deps import get_current_user
+from app.deps import (
+    LOGIN_PER_IP,
+    LOGIN_PER_USERNAME,
+    REGISTER_PER_IP,
+    Principal,
+    enforce_rate_limit,
+    get_current_user,
+    invalidate_principal,
+    rate_limit_by_ip,
+)
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_db
+from app.db import get_async_db, get_db, run_write
 from app.model import User, Role
 from app.schemas import UserCreate, UserOut, Token
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import hash_password, verify_and_update_password, create_access_token
 
 router = APIRouter()
 
 
+def _add_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _set_password_hash(db: Session, user_id: int, password_hash: str) -> None:
+    db.execute(update(User).where(User.id == user_id).values(password_hash=password_hash))
+    db.commit()
+
+
 @router.post(
     "/register",
     response_model=UserOut,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit_by_ip("register", REGISTER_PER_IP))],
 )
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing = (
-        db.query(User)
-        .filter((User.username == user_in.username) | (User.email == user_in.email))
-        .first()
+async def register(
+    user_in: UserCreate,
+    read_db: AsyncSession = Depends(get_async_db),
+    db: Session = Depends(get_db),
+):
+    existing = await read_db.scalar(
+        select(User.id)
+        .where((User.username == user_in.username) | (User.email == user_in.email))
+        .limit(1)
     )
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username or email already registered.",
         )
+    # hand the connection back while bcrypt runs;
+    # the unique constraints still catch a concurrent duplicate
+    await read_db.close()
 
     user = User(
         username=user_in.username,
         email=user_in.email,
-        password_hash=hash_password(user_in.password),
+        password_hash=await hash_password(user_in.password),
         role=Role.user,
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    return await run_write(_add_user, db, user)
 
 
-@router.post("/login", response_model=Token)
-def login(
+@router.post(
+    "/login",
+    response_model=Token,
+    dependencies=[Depends(rate_limit_by_ip("login", LOGIN_PER_IP))],
+)
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
+    read_db: AsyncSession = Depends(get_async_db),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    # per account too, against guessing one password from many addresses;
+    # checked before bcrypt so throttled attempts cost no hashing
+    enforce_rate_limit("login_username", LOGIN_PER_USERNAME, form_data.username)
+    row = (
+        await read_db.execute(
+            select(User.id, User.password_hash).where(User.username == form_data.username)
+        )
+    ).first()
+    # hand the connection back while bcrypt runs
+    await read_db.close()
+    verified, new_hash = (
+        await verify_and_update_password(form_data.password, row.password_hash)
+        if row
+        else (False, None)
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password.",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(subject=user.username)
+    if new_hash:
+        # stored hash predates the current BCRYPT_ROUNDS; upgrade it transparently
+        await run_write(_set_password_hash, db, row.id, new_hash)
+
+    access_token = create_access_token(subject=form_data.username)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserOut)
-def read_current_user(current_user: User = Depends(get_current_user)):  # Placeholder for actual dependency
+def read_current_user(current_user: Principal = Depends(get_current_user)):  # Placeholder for actual dependency
     return current_user
 
 
@@ -76,4 +127,5 @@ def make_admin(username: str, db: Session = Depends(get_db)):
     user.role = Role.admin
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.username)
     return user
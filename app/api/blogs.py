@@ -1,44 +1,143 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from functools import partial
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_db
-from app.deps import get_current_user, require_role, get_user_by_username
+from app.db import get_db, get_read_db, get_async_db, run_write
+from app.deps import (
+    BLOG_PER_USER,
+    CHAT_PER_USER,
+    Principal,
+    get_current_user,
+    rate_limit_by_user,
+    rate_limiter,
+    require_role,
+    resolve_principal,
+)
 from app.model.blog import BlogStatus
-from app.model.user import Role, User
+from app.model.user import Role
 from app.model.blog import BlogStatus
-from app.schemas.blog import BlogCreate, BlogUpdate, BlogOut
+from app.schemas.blog import (
+    BlogCreate,
+    BlogUpdate,
+    BlogOut,
+    BlogSearchHit,
+    BlogModerate,
+    BlogModerateResult,
+    BlogStats,
+    ModerationAction,
+)
+from app.schemas.chat import ChatMessageOut
 from app.crud import blog_crud as blog_crud
+from app.crud import async_blog_crud
+from app.crud import blog_stats_crud
+from app.crud import chat_crud
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+from app.api.conditional import conditional_response, make_etag
+from app.api.responses import NEXT_CURSOR_HEADER, fieldset, json_body
+from app.core.serialization import encode_rows
 from app.services.notifications import notifier
 from app.services.chat import blog_chat_manager
-from app.core.security import decode_token
+from app.services.chat_history import chat_history
+from app.services.snapshots import snapshot_publisher
 
 
 router = APIRouter()
 
 
+def _page(list_fn, db: Session, response: Response, cursor: str | None, limit: int, **kwargs):
+    """
+    Run a keyset-paginated list query.
+    The body stays a plain list; the opaque cursor for the
+    next page (if any) is returned in the X-Next-Cursor header.
+    """
+    try:
+        items, next_cursor = list_fn(db, cursor=cursor, limit=limit, **kwargs)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
+
+
 # -------------------------
 # Admin / Approver: list pending blogs
 # -------------------------
 @router.get("/pending", response_model=list[BlogOut])
 def list_pending_blogs(
-    db: Session = Depends(get_db),
-    current_admin: User = Depends(require_role(Role.admin, Role.approver)),
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: tuple[str, ...] = Depends(fieldset(blog_crud.BLOG_FIELDS)),
+    db: Session = Depends(get_read_db),
+    current_admin: Principal = Depends(require_role(Role.admin, Role.approver)),
 ):
     """
-    List all blogs with status 'pending'.
+    List blogs with status 'pending', newest first, one page at a time.
     Only admin or approver can see this.
     """
-    return blog_crud.list_pending(db)
+    rows = _page(blog_crud.list_pending, db, response, cursor, limit, fields=fields)
+    return json_body(encode_rows(fields, rows), response)
 
 
 
 # -------------------------
-# Public: list all approved blogs
+# Admin / Approver: moderation stats
+# -------------------------
+@router.get("/stats", response_model=BlogStats)
+def blog_stats(
+    db: Session = Depends(get_read_db),
+    current_admin: Principal = Depends(require_role(Role.admin, Role.approver)),
+):
+    return blog_stats_crud.get_stats(db)
+
+
+# -------------------------
+# Public: list approved blogs (paginated)
 # -------------------------
 @router.get("/", response_model=list[BlogOut])
-def list_public_blogs(db: Session = Depends(get_db)):
-    blogs = blog_crud.list_approved(db)
-    return blogs
+def list_public_blogs(
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: tuple[str, ...] = Depends(fieldset(blog_crud.BLOG_FIELDS)),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Approved blogs, newest first. Feed cards can ask for
+    `?fields=id,title,excerpt,created_at` and skip the full content.
+    """
+    # ETag only: the version's max(updated_at) can go back in time, so it
+    # is no Last-Modified; the body is cached under the same version
+    version = blog_crud.approved_version(db)
+    etag = make_etag("blogs", cursor, limit, ",".join(fields), *version)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    body = _page(blog_crud.list_public_page, db, response, cursor, limit, fields=fields, version=version)
+    return json_body(body, response)
+
+
+
+# -------------------------
+# Public: full-text search over approved blogs
+# -------------------------
+@router.get("/search", response_model=list[BlogSearchHit])
+def search_blogs(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Ranked (BM25) search over title and content, with highlighted snippets.
+    Paginated like the feed: follow X-Next-Cursor.
+    """
+    return _page(partial(blog_crud.search_approved, q=q), db, response, cursor, limit)
 
 
 
@@ -53,7 +152,7 @@ def list_public_blogs(db: Session = Depends(get_db)):
 # def create_blog(
 #     blog_in: BlogCreate,
 #     db: Session = Depends(get_db),
-#     current_user: User = Depends(get_current_user),
+#     current_user: Principal = Depends(get_current_user),
 # ):
 #     return blog_crud.create_blog(db, current_user.id, blog_in)
 
@@ -65,13 +164,14 @@ def list_public_blogs(db: Session = Depends(get_db)):
     "/",
     response_model=BlogOut,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit_by_user("create_blog", BLOG_PER_USER))],
 )
 async def create_blog(
     blog_in: BlogCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    blog = blog_crud.create_blog(db, current_user.id, blog_in)
+    blog = await run_write(blog_crud.create_blog, db, current_user.id, blog_in)
 
     # Publish SSE event for new pending blog
     if blog.status == BlogStatus.pending:
@@ -93,11 +193,21 @@ async def create_blog(
 # Only approved are visible publicly
 # -------------------------
 @router.get("/{blog_id}", response_model=BlogOut)
-def get_blog(blog_id: int, db: Session = Depends(get_db)):
-    blog = blog_crud.get_blog(db, blog_id)
-    if not blog or blog.status != BlogStatus.approved:
+def get_blog(
+    blog_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+):
+    blog = blog_crud.get_public_blog(db, blog_id)
+    if not blog:
         # Spec says: only approved articles are public
         raise HTTPException(status_code=404, detail="Blog not found")
+
+    etag = make_etag("blog", blog.id, blog.updated_at)
+    not_modified = conditional_response(request, response, etag, blog.updated_at)
+    if not_modified:
+        return not_modified
     return blog
 
 
@@ -109,7 +219,7 @@ def update_blog(
     blog_id: int,
     blog_update: BlogUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     blog = blog_crud.get_blog(db, blog_id)
     if not blog:
@@ -133,9 +243,9 @@ def update_blog(
 def delete_blog(
     blog_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    blog = blog_crud.get_blog(db, blog_id)
+    blog = blog_crud.get_blog(db, blog_id, with_content=False)
     if not blog:
         raise HTTPException(status_code=404, detail="Blog not found")
 
@@ -143,10 +253,45 @@ def delete_blog(
         raise HTTPException(status_code=403, detail="Not your blog")
 
     blog_crud.delete_blog(db, blog)
+    snapshot_publisher.mark(blog_id)
     return None
 
 
 
+# -------------------------
+# Admin / Approver: bulk approve / reject in one transaction
+# -------------------------
+@router.post("/moderate", response_model=list[BlogModerateResult])
+def moderate_blogs(
+    moderation: BlogModerate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_admin: Principal = Depends(require_role(Role.admin, Role.approver)),
+):
+    target = (
+        BlogStatus.approved
+        if moderation.action == ModerationAction.approve
+        else BlogStatus.rejected
+    )
+    results = blog_crud.moderate_blogs(db, moderation.ids, target)
+
+    changed = [blog_id for blog_id, result in results.items() if result == target.value]
+    snapshot_publisher.mark(*changed)
+    if changed:
+        # one event for the whole batch, sent after the response
+        background_tasks.add_task(
+            notifier.publish,
+            {
+                "type": "blogs_moderated",
+                "action": moderation.action.value,
+                "blog_ids": changed,
+                "moderator_id": current_admin.id,
+            },
+        )
+
+    return [{"id": blog_id, "result": result} for blog_id, result in results.items()]
+
+
 # -------------------------
 # Admin / Approver: approve
 # -------------------------
@@ -154,13 +299,15 @@ def delete_blog(
 def approve_blog(
     blog_id: int,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(require_role(Role.admin, Role.approver)),
+    current_admin: Principal = Depends(require_role(Role.admin, Role.approver)),
 ):
     blog = blog_crud.get_blog(db, blog_id)
     if not blog:
         raise HTTPException(status_code=404, detail="Blog not found")
 
-    return blog_crud.approve_blog(db, blog)
+    blog = blog_crud.approve_blog(db, blog)
+    snapshot_publisher.mark(blog.id)
+    return blog
 
 
 # -------------------------
@@ -170,13 +317,49 @@ def approve_blog(
 def reject_blog(
     blog_id: int,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(require_role(Role.admin, Role.approver)),
+    current_admin: Principal = Depends(require_role(Role.admin, Role.approver)),
 ):
     blog = blog_crud.get_blog(db, blog_id)
     if not blog:
         raise HTTPException(status_code=404, detail="Blog not found")
 
-    return blog_crud.reject_blog(db, blog)
+    blog = blog_crud.reject_blog(db, blog)
+    snapshot_publisher.mark(blog.id)
+    return blog
+
+# -------------------------
+# Authenticated: chat history (newest first)
+# -------------------------
+@router.get("/{blog_id}/chat", response_model=list[ChatMessageOut])
+async def get_chat_history(
+    blog_id: int,
+    before: int | None = Query(None, description="id of the oldest message already loaded"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Messages still buffered by chat_history (not yet written, id null)
+    are newer than any stored one, so the first page starts with them.
+    """
+    blog = await async_blog_crud.get_blog(db, blog_id, with_content=False)
+    if not blog or not (
+        blog.status == BlogStatus.approved
+        or blog.author_id == current_user.id
+        or current_user.role in (Role.admin, Role.approver)
+    ):
+        raise HTTPException(status_code=404, detail="Blog not found")
+
+    buffered = chat_history.recent(blog_id, limit) if before is None else []
+    stored = await chat_crud.list_messages(db, blog_id, before, limit)
+    if buffered:
+        # a batch written since recent() is in both
+        written = {(m.user_id, m.created_at, m.body) for m in stored}
+        buffered = [
+            m for m in buffered if (m["user_id"], m["created_at"], m["body"]) not in written
+        ]
+    return (buffered + stored)[:limit]
+
 
 # -------------------------
 # WebSocket: blog chat
@@ -186,7 +369,7 @@ def reject_blog(
 async def blog_chat_ws(
     websocket: WebSocket,
     blog_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     WebSocket chat for a specific blog.
@@ -202,32 +385,35 @@ async def blog_chat_ws(
         await websocket.close(code=1008)  # Policy Violation
         return
 
-    try:
-        payload = decode_token(token)
-        username = payload.get("sub")
-        if not username:
-            await websocket.close(code=1008)
-            return
-        user = get_user_by_username(db, username=username)
-        if not user or not user.is_active:
-            await websocket.close(code=1008)
-            return
-    except Exception:
+    user = await resolve_principal(db, token)
+    if user is None:
         await websocket.close(code=1008)
         return
 
     # ---- Ensure blog exists ----
-    blog = blog_crud.get_blog(db, blog_id)
+    blog = await async_blog_crud.get_blog(db, blog_id, with_content=False)
     if not blog:
         await websocket.close(code=1008)
         return
 
+    # Done with the database: hand the pooled connection back now
+    # instead of holding it for the lifetime of the chat.
+    await db.close()
+
     # ---- Connect ----
     await blog_chat_manager.connect(blog_id, websocket)
 
     try:
         while True:
             text = await websocket.receive_text()
+            # one budget per user across all their sockets; a client that
+            # floods past the burst is cut off rather than queued
+            if rate_limiter.hit(("chat", user.id), CHAT_PER_USER):
+                blog_chat_manager.disconnect(blog_id, websocket)
+                await websocket.close(code=1008, reason="rate limited")
+                return
+            # persisted in batches by chat_history, not per message
+            chat_history.record(blog_id, user.id, user.username, text)
             # You can format messages however you like
             message = f"{user.username}: {text}"
             await blog_chat_manager.broadcast(blog_id, message)
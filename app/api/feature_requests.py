@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
-from app.deps import get_current_user, require_role
-from app.model.user import User, Role
+from app.db.session import get_db, get_read_db
+from app.deps import Principal, get_current_user, require_role
+from app.model.feature_request import FeatureRequestStatus
+from app.model.user import Role
 from app.schemas import (
     FeatureRequestCreate,
     FeatureRequestUpdateStatus,
     FeatureRequestOut,
+    FeatureRequestSort,
 )
+from app.schemas.feature_request import FeatureRequestStatusEnum
 from app.crud import feature_request_crud as fr_crud
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+from app.api.responses import NEXT_CURSOR_HEADER, fieldset, json_body
+from app.core.serialization import encode_rows
+from app.api.conditional import conditional_response, make_etag
 
 router = APIRouter()
 
@@ -19,11 +26,47 @@ router = APIRouter()
 # -------------------------
 @router.get("/", response_model=list[FeatureRequestOut])
 def list_feature_requests(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    fr_status: FeatureRequestStatusEnum | None = Query(None, alias="status"),
+    min_priority: int | None = None,
+    max_priority: int | None = None,
+    user_id: int | None = Query(None, description="submitter"),
+    min_rating: int | None = None,
+    max_rating: int | None = None,
+    sort: FeatureRequestSort = FeatureRequestSort.recent,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: tuple[str, ...] = Depends(fieldset(fr_crud.FEATURE_REQUEST_FIELDS)),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    # spec says auth: User; we don't filter by user here, but we could if needed
-    return fr_crud.list_feature_requests(db)
+    last_modified, count = fr_crud.collection_version(db)
+    # the validator covers the whole collection; the query string picks the page
+    etag = make_etag("feature-requests", str(request.query_params), last_modified, count)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    try:
+        items, next_cursor = fr_crud.list_feature_requests(
+            db,
+            status=FeatureRequestStatus(fr_status.value) if fr_status else None,
+            min_priority=min_priority,
+            max_priority=max_priority,
+            user_id=user_id,
+            min_rating=min_rating,
+            max_rating=max_rating,
+            sort=sort,
+            cursor=cursor,
+            limit=limit,
+            fields=fields,
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return json_body(encode_rows(fields, items), response)
 
 
 # -------------------------
@@ -37,7 +80,7 @@ def list_feature_requests(
 def create_feature_request(
     fr_in: FeatureRequestCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     return fr_crud.create_feature_request(db, current_user.id, fr_in)
 
@@ -50,7 +93,7 @@ def update_feature_request_status(
     fr_id: int,
     changes: FeatureRequestUpdateStatus,
     db: Session = Depends(get_db),
-    current_admin: User = Depends(require_role(Role.admin, Role.approver)),
+    current_admin: Principal = Depends(require_role(Role.admin, Role.approver)),
 ):
     fr = fr_crud.get_feature_request(db, fr_id)
     if not fr:
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Response
+
+from app.core import metrics
+from app.crud import blog_crud
+from app.deps import principal_cache
+from app.services.chat import blog_chat_manager
+from app.services.notifications import notifier
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+CACHES = {
+    "blog": blog_crud.blog_cache,
+    "feed": blog_crud.feed_cache,
+    "principal": principal_cache,
+}
+
+
+def live_gauges() -> list[str]:
+    """Point-in-time values, read from the services at scrape time."""
+    sse = metrics.Gauge("sse_subscribers", "Connected SSE notification subscribers.")
+    sse.inc(amount=notifier.subscriber_count)
+
+    chat = metrics.Gauge("chat_connections", "Open chat sockets per room (blog id).", ("room",))
+    for blog_id, size in blog_chat_manager.room_sizes().items():
+        chat.inc(str(blog_id), amount=size)
+
+    cache_size = metrics.Gauge("cache_entries", "Entries held by an in-process cache.", ("cache",))
+    cache_events = metrics.Counter("cache_events_total", "Cache lookups and evictions.", ("cache", "event"))
+    for name, cache in CACHES.items():
+        stats = cache.stats()
+        cache_size.inc(name, amount=stats["size"])
+        for key in ("hits", "misses", "evictions"):
+            cache_events.inc(name, key, amount=stats[key])
+
+    return [line for gauge in (sse, chat, cache_size, cache_events) for line in gauge.render()]
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Prometheus scrape target (this worker process only). Async on purpose:
+    the metrics are only touched from the event loop thread.
+    """
+    return Response(metrics.render(metrics.REQUEST_METRICS, [live_gauges]), media_type=CONTENT_TYPE)
@@ -1,12 +1,11 @@
-import asyncio
 import json
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Header, Request
 from fastapi.responses import StreamingResponse
 
 from app.deps import require_role
 from app.model.user import Role
-from app.services.notifications import notifier
+from app.services.notifications import SubscriberLagged, notifier
 
 router = APIRouter()
 
@@ -14,30 +13,40 @@ router = APIRouter()
 @router.get("/sse")
 async def notifications_sse(
     request: Request,
+    last_event_id: str | None = Header(None),
     current_admin = Depends(require_role(Role.admin, Role.approver)),
 ):
     """
     SSE stream for admins/approvers.
     Emits an event whenever a new pending blog is created.
+    Every event has an `id:`; browsers send it back as Last-Event-ID on
+    reconnect and we replay what they missed (as far as the buffer goes).
     """
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
 
     async def event_generator():
-        queue = await notifier.connect()
+        subscriber = await notifier.connect(resume_from)
         try:
             while True:
                 # stop if client disconnected
                 if await request.is_disconnected():
                     break
 
-                try:
-                    # wait for next event with timeout just to send keep-alive
-                    event = await asyncio.wait_for(queue.get(), timeout=15.0)
-                    data_str = json.dumps(event)
-                    yield f"data: {data_str}\n\n"
-                except asyncio.TimeoutError:
+                # wait for next events with timeout just to send keep-alive
+                events = await notifier.next_events(subscriber, timeout=15.0)
+                if not events:
                     # keep connection alive
                     yield ": keep-alive\n\n"
+                for event_id, event in events:
+                    data_str = json.dumps(event)
+                    yield f"id: {event_id}\ndata: {data_str}\n\n"
+        except SubscriberLagged:
+            # too far behind; the client reconnects and resyncs
+            pass
         finally:
-            notifier.disconnect(queue)
+            notifier.disconnect(subscriber)
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
@@ -0,0 +1,43 @@
+from typing import Sequence
+
+from fastapi import HTTPException, Query, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def json_body(body: bytes, response: Response) -> Response:
+    """
+    Send an already-encoded JSON body as-is, skipping response_model
+    validation and re-encoding. Headers set on the injected `response`
+    (ETag, Last-Modified, X-Next-Cursor) are carried over, since FastAPI
+    only merges them into responses it builds itself.
+    """
+    return Response(body, media_type="application/json", headers=dict(response.headers))
+
+
+def fieldset(available: Sequence[str]):
+    """
+    Dependency for a `?fields=id,title,created_at` sparse fieldset on a
+    list endpoint. Resolves to the requested names in schema order (all of
+    `available` when the parameter is absent); unknown names are a 400.
+    """
+    available = tuple(available)
+
+    def _fields(
+        fields: str | None = Query(
+            None,
+            description=f"Comma-separated subset of: {', '.join(available)}",
+        ),
+    ) -> tuple[str, ...]:
+        if not fields:
+            return available
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(available)
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}" if unknown else "No fields requested",
+            )
+        return tuple(name for name in available if name in requested)
+
+    return _fields
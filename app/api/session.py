@@ -1,21 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
-from app.deps import get_current_user
-from app.model.user import User
-from app.schemas.draft import DraftSave, DraftOut
+from app.db.session import get_read_db
+from app.deps import Principal, get_current_user
+from app.schemas.draft import DraftSave, DraftOut, DraftPatch, DraftPatchResult
 from app.crud import draft_crud 
+from app.services.draft_autosave import DraftConflict, draft_autosave
 
 router = APIRouter()
 
 
 @router.get("/draft", response_model=DraftOut)
 def get_draft(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    draft = draft_crud.get_draft_for_user(db, current_user.id)
+    # unflushed autosave first, then the stored draft
+    draft = draft_autosave.get(current_user.id) or draft_crud.get_draft_for_user(db, current_user.id)
     if not draft:
         # empty draft object for new users
         return DraftOut(title=None, content=None, updated_at=None)
@@ -25,8 +26,47 @@ def get_draft(
 @router.post("/draft", response_model=DraftOut)
 def save_draft(
     draft_in: DraftSave,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    flush: bool = Query(False, description="Persist now (explicit save) instead of coalescing"),
+    current_user: Principal = Depends(get_current_user),
 ):
-    draft = draft_crud.save_or_update_draft(db, current_user.id, draft_in)
+    draft = draft_autosave.save(current_user.id, draft_in.title, draft_in.content)
+    if flush:
+        _flush(current_user.id)
     return draft
+
+
+@router.patch("/draft", response_model=DraftPatchResult)
+def patch_draft(
+    patch: DraftPatch,
+    flush: bool = Query(False, description="Persist now (explicit save) instead of coalescing"),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Incremental save: send only the edits made since `base_revision`.
+    409 means the draft changed elsewhere; GET it and resend.
+    """
+    try:
+        draft = draft_autosave.patch(current_user.id, patch.base_revision, patch.edits)
+    except DraftConflict as exc:
+        raise _conflict(exc)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+
+    if flush:
+        _flush(current_user.id)
+    return draft
+
+
+def _conflict(exc: DraftConflict) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"message": "Draft has changed; resync and retry.", "revision": exc.revision},
+    )
+
+
+def _flush(user_id: int) -> None:
+    # another worker may have stored a newer revision; the save was not written
+    try:
+        draft_autosave.flush([user_id])
+    except DraftConflict as exc:
+        raise _conflict(exc)
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl
-from typing import List
+from typing import List, Literal
 
 
 class Settings(BaseSettings):
@@ -8,12 +8,82 @@ class Settings(BaseSettings):
     API_PREFIX: str = "/api"
 
     DATABASE_URL: str = "sqlite:///./dev.db"
+    # create / upgrade the schema on startup when it is behind
+    # (app/db/schema.py); False = refuse to start, run `app.manage init-db`
+    DB_AUTO_CREATE: bool = True
+
+    # SQLite profile. "production": WAL + the pragmas below on every
+    # connection, one serialized writer connection (BEGIN IMMEDIATE) for
+    # get_db, and a separate query_only pool for get_read_db (GET endpoints).
+    SQLITE_PROFILE: Literal["default", "production"] = "default"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL"] = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KIB: int = 64 * 1024
+    SQLITE_READ_POOL_SIZE: int = 8
 
     SECRET_KEY: str = "change-me-in-env"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # bcrypt cost; existing hashes are upgraded on the next successful login
+    BCRYPT_ROUNDS: int = 12
+    # dedicated process pool for hashing (0 = hash inline in the request thread)
+    PASSWORD_HASH_WORKERS: int = 2
+    # max hashes queued or running before login/register answer 503
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
     CORS_ORIGINS: List[AnyHttpUrl] = []
 
+    # In-process read-through cache for public blog reads
+    BLOG_CACHE_SIZE: int = 5000
+    FEED_CACHE_SIZE: int = 500
+    BLOG_CACHE_TTL_SECONDS: float = 30.0
+
+    # Authenticated principal / decoded-token cache
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 30.0
+
+    # SSE notifications: shared replay buffer size, and what to do with a
+    # subscriber that falls behind it ("drop" = skip ahead, "disconnect")
+    SSE_BUFFER_SIZE: int = 1000
+    SSE_LAG_POLICY: Literal["drop", "disconnect"] = "drop"
+
+    # chat: messages a socket may fall behind before it is disconnected
+    CHAT_MAX_LAG: int = 256
+    # recent messages per room replayed to new chat connections (from memory)
+    CHAT_TAIL_SIZE: int = 50
+    # chat history write-behind: flush at this many messages or this age
+    CHAT_HISTORY_BATCH_SIZE: int = 200
+    CHAT_HISTORY_FLUSH_SECONDS: float = 1.0
+
+    # draft autosaves are coalesced in memory and upserted at most this often
+    DRAFT_FLUSH_SECONDS: float = 5.0
+
+    # static snapshots of the public blog / feed JSON (+ .gz) for a front
+    # proxy to serve; regenerated after moderation. Empty = disabled.
+    SNAPSHOT_DIR: str = ""
+    SNAPSHOT_PAGE_SIZE: int = 20
+    SNAPSHOT_FLUSH_SECONDS: float = 1.0
+
+    # token-bucket rate limits, "N/second|minute|hour": N at once, refilled
+    # at N per period. Per process; keys are the client IP or the user id.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_LOGIN_PER_IP: str = "20/minute"
+    RATE_LIMIT_LOGIN_PER_USERNAME: str = "10/minute"
+    RATE_LIMIT_REGISTER_PER_IP: str = "5/minute"
+    RATE_LIMIT_BLOG_PER_USER: str = "10/minute"
+    RATE_LIMIT_CHAT_PER_USER: str = "10/second"
+
+    # request latency / SQL / live-connection metrics at GET /metrics
+    # (Prometheus text format, per worker process)
+    METRICS_ENABLED: bool = True
+
+    # pub/sub between worker processes for SSE + chat:
+    # "memory://" (single process) or "unix:///path/to/hub.sock"
+    BROKER_URL: str = "memory://"
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,94 @@
+"""
+Bcrypt off the request threads.
+
+Password hashing is CPU-bound and holds the GIL, so running it in
+Starlette's shared threadpool lets a burst of logins starve every other
+sync endpoint. `HashingPool` runs it in a dedicated, separately sized
+process pool with a bounded number of in-flight jobs; past that bound it
+fails fast with `HashingPoolBusy` (mapped to 503) instead of queueing.
+Async endpoints await the job (`run_async`), so no request thread sits
+blocked on it either.
+
+This module is also what the worker processes import, so it must stay
+light: no app config, no database.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+
+from passlib.context import CryptContext
+
+
+class HashingPoolBusy(RuntimeError):
+    """Too many password hashes already queued; retry later."""
+
+
+@lru_cache(maxsize=None)
+def crypt_context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def hash_secret(secret: bytes, rounds: int) -> str:
+    return crypt_context(rounds).hash(secret)
+
+
+def verify_and_update(secret: bytes, hashed: str, rounds: int) -> tuple[bool, str | None]:
+    """(matches, new_hash). new_hash is set when `hashed` uses an outdated cost."""
+    return crypt_context(rounds).verify_and_update(secret, hashed)
+
+
+class HashingPool:
+    def __init__(self, workers: int, max_pending: int) -> None:
+        # workers == 0 hashes inline in the calling thread (tests, tiny deployments)
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn, not fork: the server process has threads running
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolBusy()
+        try:
+            if self.workers == 0:
+                future: Future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as exc:
+                    future.set_exception(exc)
+            else:
+                future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn, *args):
+        """Submit and wait (from a sync endpoint running in the threadpool)."""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn, *args):
+        """Submit and await (from an async endpoint)."""
+        if self.workers == 0:
+            # inline mode: still keep bcrypt off the event loop
+            return await asyncio.to_thread(self.run, fn, *args)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
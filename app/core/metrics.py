@@ -0,0 +1,230 @@
+"""
+In-process metrics in the Prometheus text format (no client library).
+
+- MetricsMiddleware (pure ASGI) times every HTTP request under its route
+  template (`/api/blogs/{blog_id}`, never the raw path, so label
+  cardinality stays bounded), tracks requests in flight and counts
+  responses by status code.
+- SQLAlchemy cursor events attribute each statement to the request that
+  ran it, through a contextvar holding a mutable per-request tally; sync
+  endpoints still see it, as the threadpool runs them in a copy of the
+  request's context.
+
+Observations happen on the event loop thread only (the middleware), so
+the counters need no locks. Each worker process keeps its own numbers.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LabelValues = Tuple[str, ...]
+
+# seconds; tuned for an API whose typical request takes a few ms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Fixed buckets; observe() is one bisect and two additions."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+# -------------------------
+# Request metrics
+# -------------------------
+
+REQUEST_LABELS = ("method", "route")
+
+requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests being handled.")
+requests_total = Counter("http_requests_total", "HTTP responses by status code.", REQUEST_LABELS + ("status",))
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, until the last body byte (SSE: until the headers).",
+    REQUEST_LABELS,
+)
+request_sql_statements = Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per HTTP request.",
+    REQUEST_LABELS,
+    buckets=SQL_COUNT_BUCKETS,
+)
+request_sql_duration = Histogram(
+    "http_request_sql_seconds",
+    "Time spent in SQL statements per HTTP request.",
+    REQUEST_LABELS,
+)
+
+REQUEST_METRICS = (requests_in_flight, requests_total, request_duration, request_sql_statements, request_sql_duration)
+
+
+class SQLTally:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.seconds = 0.0
+
+
+_current_tally: ContextVar[SQLTally | None] = ContextVar("sql_tally", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_tally.get() is not None:
+        conn.info["metrics_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    tally = _current_tally.get()
+    if tally is None:
+        return
+    started = conn.info.pop("metrics_started", None)
+    tally.statements += 1
+    if started is not None:
+        tally.seconds += time.perf_counter() - started
+
+
+def route_template(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Records the request metrics above for every HTTP request.
+    A text/event-stream response counts as done once its headers are
+    sent, so open SSE connections don't sit in the latency or in-flight
+    numbers (they have their own gauge).
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        tally = SQLTally()
+        token = _current_tally.set(tally)
+        requests_in_flight.inc()
+        state = {"status": 500, "done": False}
+
+        def finish() -> None:
+            if state["done"]:
+                return
+            state["done"] = True
+            requests_in_flight.dec()
+            labels = (scope["method"], route_template(scope))
+            requests_total.inc(*labels, str(state["status"]))
+            request_duration.observe(time.perf_counter() - started, *labels)
+            request_sql_statements.observe(tally.statements, *labels)
+            request_sql_duration.observe(tally.seconds, *labels)
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                await send(message)
+                for name, value in message.get("headers", ()):
+                    if name == b"content-type" and value.startswith(b"text/event-stream"):
+                        finish()
+                return
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()
+            _current_tally.reset(token)
+
+
+def render(metrics: Iterable, collectors: Iterable[Callable[[], List[str]]] = ()) -> str:
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    for collect in collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
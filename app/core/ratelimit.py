@@ -0,0 +1,118 @@
+"""
+In-memory token-bucket rate limiting.
+
+A policy "N/period" lets a key spend N requests at once, refilled at
+N per period. Buckets live in `shards` dicts, each behind its own lock,
+so sync endpoints in the threadpool rarely contend; a check is a hash,
+a dict lookup and a few float operations.
+
+Memory stays bounded without a background task: each shard keeps its
+buckets in least-recently-used order, and a new key arriving at a full
+shard evicts the least recently used one (it starts full again). A
+bucket that has been idle long enough to be full again is the same as
+no bucket, so each shard also drops those periodically, lazily from
+inside a check and looking at no more than SWEEP_LIMIT of its oldest
+buckets per call.
+
+Per process: with several workers each enforces its own budget.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from typing import Hashable
+
+PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0}
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """`capacity` requests at once, refilled over `period` seconds."""
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimit":
+        """Parse "10/minute" (also "5/second", "100/hour") into RateLimit(10, 60.0)."""
+        count, _, unit = spec.partition("/")
+        period = PERIODS.get(unit.strip().rstrip("s"))
+        if period is None or not count.strip().isdigit() or int(count) < 1:
+            raise ValueError(f"invalid rate limit {spec!r}, expected e.g. '10/minute'")
+        return cls(int(count), period)
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "next_sweep")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # key -> [tokens, last refill (monotonic), seconds until full again],
+        # least recently used first
+        self.buckets: OrderedDict[Hashable, list] = OrderedDict()
+        self.next_sweep = 0.0
+
+
+class TokenBucketLimiter:
+    SWEEP_INTERVAL = 10.0
+    SWEEP_LIMIT = 256
+
+    def __init__(self, shards: int = 16, max_keys: int = 100_000) -> None:
+        self._shards = [_Shard() for _ in range(shards)]
+        self._max_per_shard = max(1, max_keys // shards)
+        # switched off in tests and benchmarks
+        self.enabled = True
+
+    def hit(self, key: Hashable, limit: RateLimit, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens from `key`'s bucket. Returns 0.0 if allowed,
+        otherwise the seconds until the request would be (nothing is taken).
+        """
+        if not self.enabled:
+            return 0.0
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with shard.lock:
+            buckets = shard.buckets
+            bucket = buckets.get(key)
+            if bucket is None:
+                tokens = float(limit.capacity)
+                if now >= shard.next_sweep:
+                    self._sweep(shard, now)
+            else:
+                tokens = min(limit.capacity, bucket[0] + (now - bucket[1]) * limit.rate)
+                buckets.move_to_end(key)
+            if tokens < cost:
+                return (cost - tokens) / limit.rate
+            tokens -= cost
+            if bucket is None and len(buckets) >= self._max_per_shard:
+                buckets.popitem(last=False)
+            buckets[key] = [tokens, now, now + (limit.capacity - tokens) / limit.rate]
+            return 0.0
+
+    def _sweep(self, shard: _Shard, now: float) -> None:
+        buckets = shard.buckets
+        oldest = islice(buckets.items(), self.SWEEP_LIMIT)
+        expired = [key for key, bucket in oldest if bucket[2] <= now]
+        for key in expired:
+            del buckets[key]
+        # a batch that was all idle probably has more behind it: sweep again on the next new key
+        shard.next_sweep = now if len(expired) == self.SWEEP_LIMIT else now + self.SWEEP_INTERVAL
+
+    def reset(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+
+def retry_after_header(seconds: float) -> dict:
+    """Retry-After takes whole seconds; round up so an immediate retry passes."""
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
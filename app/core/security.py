@@ -1,12 +1,13 @@
 from datetime import datetime, timedelta
 from typing import Optional
 
-from passlib.context import CryptContext
 import jwt
 
 from app.core.config import settings
+from app.core.hashing import HashingPool, crypt_context, hash_secret, verify_and_update
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = crypt_context(settings.BCRYPT_ROUNDS)
+hashing_pool = HashingPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
 ALGORITHM = "HS256"
 MAX_PASSWORD_BYTES = 72
 
@@ -24,13 +25,29 @@ def _truncate_for_bcrypt(password: str) -> bytes:
     return pw_bytes
 
 
-def hash_password(password: str) -> str:
+# The three helpers below await bcrypt in `hashing_pool` (no thread waits
+# on it) and raise HashingPoolBusy when it is saturated.
+
+async def hash_password(password: str) -> str:
     # Passlib is fine with bytes here, it will pass them through to bcrypt
-    return pwd_context.hash(_truncate_for_bcrypt(password))
+    return await hashing_pool.run_async(hash_secret, _truncate_for_bcrypt(password), settings.BCRYPT_ROUNDS)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return (await verify_and_update_password(plain_password, hashed_password))[0]
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(_truncate_for_bcrypt(plain_password), hashed_password)
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    (matches, new_hash). new_hash is set when the stored hash is below the
+    configured BCRYPT_ROUNDS (pwd_context.needs_update) and should be saved.
+    """
+    return await hashing_pool.run_async(
+        verify_and_update,
+        _truncate_for_bcrypt(plain_password),
+        hashed_password,
+        settings.BCRYPT_ROUNDS,
+    )
 
 
 def create_access_token(
@@ -0,0 +1,32 @@
+"""
+Fast JSON for list endpoints.
+
+The rows come straight from a column SELECT (plain tuples, no ORM
+instances), their types are already what the schema declares, so they
+are zipped with the schema's field names and encoded by orjson in one
+call instead of being validated into pydantic models one by one and
+run through jsonable_encoder + json.dumps.
+"""
+from typing import Iterable, Sequence
+
+import orjson
+from pydantic import BaseModel
+
+
+def fields_of(schema: type[BaseModel]) -> tuple[str, ...]:
+    """Output field names of `schema`, in the order pydantic would emit them."""
+    return tuple(schema.model_fields)
+
+
+def encode_rows(fields: Sequence[str], rows: Iterable[Sequence]) -> bytes:
+    """
+    JSON array of objects, one per row; `rows` hold values in `fields` order.
+    Enums are written as their value and naive datetimes as ISO 8601, the
+    same output the pydantic schema would produce.
+    """
+    return orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+
+def encode_row(fields: Sequence[str], row: Sequence) -> bytes:
+    """Single-object variant of `encode_rows`."""
+    return orjson.dumps(dict(zip(fields, row)))
@@ -0,0 +1,20 @@
+"""
+AsyncSession variants of the blog_crud reads used by `async def`
+endpoints (chat history, the chat WebSocket). Sync endpoints run in the
+threadpool and keep using blog_crud; async endpoints write through it
+with app.db.run_write.
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+
+from app.model.blog import Blog
+
+
+async def get_blog(db: AsyncSession, blog_id: int, with_content: bool = True) -> Blog | None:
+    query = select(Blog).where(Blog.id == blog_id)
+    if not with_content:
+        # no lazy loads on an AsyncSession: don't touch blog.content then
+        query = query.options(defer(Blog.content))
+    result = await db.execute(query)
+    return result.scalars().first()
@@ -1,7 +1,48 @@
-from sqlalchemy.orm import Session
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Sequence
 
+from sqlalchemy import delete, func, text, update
+from sqlalchemy.orm import Session, defer
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.serialization import encode_rows, fields_of
+from app.crud import blog_stats_crud
+from app.crud.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor, keyset_after, page_columns
+from app.db.fts import FTS_TABLE
 from app.model.blog import Blog, BlogStatus
-from app.schemas.blog import BlogCreate, BlogUpdate
+from app.schemas.blog import BlogCreate, BlogUpdate, BlogOut, BlogSearchHit
+
+# List queries select exactly the BlogOut columns, as plain row tuples
+BLOG_FIELDS = fields_of(BlogOut)
+_BLOG_COLUMNS = tuple(getattr(Blog, name) for name in BLOG_FIELDS)
+
+# Read-through caches for the public (approved-only) reads.
+# blog_cache: blog_id -> BlogOut
+# feed_cache: (cursor, limit, fields, feed version) -> _FeedPage
+blog_cache = TTLCache(settings.BLOG_CACHE_SIZE, settings.BLOG_CACHE_TTL_SECONDS)
+feed_cache = TTLCache(settings.FEED_CACHE_SIZE, settings.BLOG_CACHE_TTL_SECONDS)
+# a bulk change touching more public blogs than this drops the whole feed
+# cache rather than testing every cached page against every blog
+FEED_CACHE_CLEAR_THRESHOLD = 50
+
+
+@dataclass(frozen=True)
+class _FeedPage:
+    # the page, already encoded as a JSON array of BlogOut (or the requested fields of it)
+    body: bytes
+    next_cursor: str | None
+    # (created_at, id) range covered by the page: lower <= key < upper.
+    # None means unbounded (first page / last page).
+    upper: tuple | None
+    lower: tuple | None
+
+    def covers(self, key: tuple) -> bool:
+        return (self.upper is None or key < self.upper) and (
+            self.lower is None or key >= self.lower
+        )
 
 
 def create_blog(db: Session, user_id: int, blog_in: BlogCreate):
@@ -12,22 +53,129 @@ def create_blog(db: Session, user_id: int, blog_in: BlogCreate):
         status=BlogStatus.pending,
     )
     db.add(blog)
+    blog_stats_crud.apply(db, blog_stats_crud.change(Counter(), user_id, None, BlogStatus.pending))
     db.commit()
     db.refresh(blog)
     return blog
 
 
-def get_blog(db: Session, blog_id: int):
-    return db.query(Blog).filter(Blog.id == blog_id).first()
+def get_blog(db: Session, blog_id: int, with_content: bool = True):
+    """`with_content=False` leaves the content column unread (loaded on access)."""
+    query = db.query(Blog)
+    if not with_content:
+        query = query.options(defer(Blog.content))
+    return query.filter(Blog.id == blog_id).first()
+
+
+def _list_by_status(
+    db: Session,
+    status: BlogStatus,
+    cursor: str | None,
+    limit: int,
+    fields: Sequence[str] = BLOG_FIELDS,
+) -> tuple[list[tuple], str | None]:
+    """
+    Keyset pagination on (created_at, id), newest first.
+    Served by the (status, created_at, id) index, so every page
+    is a single index range scan no matter how deep it is.
+    Returns row tuples starting with the `fields` columns, not Blog
+    instances; columns not in `fields` (e.g. content) are never read.
+    Raises InvalidCursor for a cursor we did not issue.
+    """
+    query = db.query(*page_columns(Blog, fields)).filter(Blog.status == status)
+    if cursor:
+        created_at, blog_id = decode_cursor(cursor, datetime.fromisoformat, int)
+        query = query.filter(keyset_after((Blog.created_at, Blog.id), (created_at, blog_id)))
+
+    # fetch one extra row to know whether there is a next page
+    rows = query.order_by(Blog.created_at.desc(), Blog.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def list_approved(
+    db: Session,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Sequence[str] = BLOG_FIELDS,
+) -> tuple[list[tuple], str | None]:
+    return _list_by_status(db, BlogStatus.approved, cursor, limit, fields)
 
 
-def list_approved(db: Session) -> list[Blog]:
-    return (
-        db.query(Blog)
-        .filter(Blog.status == BlogStatus.approved)
-        .order_by(Blog.created_at.desc())
-        .all()
+def approved_version(db: Session) -> tuple[datetime | None, int]:
+    """
+    Version of the public feed: (max(updated_at), count).
+    Any approve / reject / edit / delete of a public blog changes it.
+    Both are O(1) per request: the max is one seek at the end of the
+    (status, updated_at) index, the count is the maintained counter row.
+    Not a modification time: the max goes back when the newest public
+    blog leaves the feed, so it only feeds the ETag and the cache key.
+    """
+    approved = Blog.status == BlogStatus.approved
+    last_modified = db.query(func.max(Blog.updated_at)).filter(approved).scalar()
+    return last_modified, blog_stats_crud.total(db, BlogStatus.approved)
+
+
+def get_public_blog(db: Session, blog_id: int) -> BlogOut | None:
+    """Cached read of a single approved blog; None if missing or not public."""
+    cached = blog_cache.get(blog_id)
+    if cached is not None:
+        return cached
+
+    generation = blog_cache.generation
+    blog = get_blog(db, blog_id)
+    if not blog or blog.status != BlogStatus.approved:
+        return None
+    out = BlogOut.model_validate(blog)
+    blog_cache.set(blog_id, out, generation=generation)
+    return out
+
+
+def list_public_page(
+    db: Session,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Sequence[str] = BLOG_FIELDS,
+    version: tuple | None = None,
+) -> tuple[bytes, str | None]:
+    """
+    Cached, pre-encoded version of `list_approved`: (JSON body, next cursor).
+    `version` (from approved_version) is part of the cache key, so a page
+    is never served under a newer feed version than it was built from,
+    even when another worker made the change and nothing here was
+    invalidated; pages of older versions just age out.
+    """
+    key = (cursor, limit, tuple(fields), version)
+    page = feed_cache.get(key)
+    if page is not None:
+        return page.body, page.next_cursor
+
+    generation = feed_cache.generation
+    blogs, next_cursor = list_approved(db, cursor=cursor, limit=limit, fields=fields)
+    page = _FeedPage(
+        body=encode_rows(fields, blogs),
+        next_cursor=next_cursor,
+        upper=tuple(decode_cursor(cursor, datetime.fromisoformat, int)) if cursor else None,
+        lower=(blogs[-1].created_at, blogs[-1].id) if next_cursor else None,
     )
+    feed_cache.set(key, page, generation=generation)
+    return page.body, page.next_cursor
+
+
+def _invalidate_public(blog_id: int, created_at: datetime, was_public: bool, is_public: bool) -> None:
+    """
+    Drop cache entries a mutation may have made stale.
+    Only feed pages whose (created_at, id) range contains the blog
+    change: with keyset pages nothing before or after it shifts.
+    """
+    blog_cache.pop(blog_id)
+    if was_public or is_public:
+        key = (created_at, blog_id)
+        feed_cache.pop_where(lambda _, page: page.covers(key))
 
 
 def update_blog(db: Session, blog: Blog, updates: BlogUpdate) -> Blog:
@@ -38,39 +186,209 @@ def update_blog(db: Session, blog: Blog, updates: BlogUpdate) -> Blog:
 
     db.commit()
     db.refresh(blog)
+    is_public = blog.status == BlogStatus.approved
+    _invalidate_public(blog.id, blog.created_at, is_public, is_public)
     return blog
 
 
 def delete_blog(db: Session, blog: Blog) -> None:
-    db.delete(blog)
+    """
+    The counters follow the row as DELETE ... RETURNING found it, not the
+    status `blog` was loaded with: it may have been moderated meanwhile.
+    """
+    row = db.execute(
+        delete(Blog)
+        .where(Blog.id == blog.id)
+        .returning(Blog.author_id, Blog.status, Blog.created_at)
+    ).first()
+    if row is not None:
+        blog_stats_crud.apply(db, blog_stats_crud.change(Counter(), row.author_id, row.status, None))
     db.commit()
+    if row is not None:
+        _invalidate_public(blog.id, row.created_at, row.status == BlogStatus.approved, False)
 
 
-def approve_blog(db: Session, blog: Blog) -> Blog:
-    blog.status = BlogStatus.approved
+def _set_status(db: Session, blog: Blog, status: BlogStatus) -> Blog:
+    """
+    Conditional on the status `blog` was read with, so of two concurrent
+    moderators of the same blog only the one whose UPDATE matched moves
+    the counters; the other just gets the current row back.
+    """
+    old = blog.status
+    result = db.execute(
+        update(Blog)
+        .where(Blog.id == blog.id, Blog.status == old)
+        .values(status=status, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 1:
+        blog_stats_crud.apply(db, blog_stats_crud.change(Counter(), blog.author_id, old, status))
     db.commit()
     db.refresh(blog)
+    _invalidate_public(
+        blog.id, blog.created_at, old == BlogStatus.approved, blog.status == BlogStatus.approved
+    )
     return blog
 
 
-def reject_blog(db: Session, blog: Blog) -> Blog:
-    blog.status = BlogStatus.rejected
+def moderate_blogs(db: Session, ids: list[int], status: BlogStatus) -> dict[int, str]:
+    """
+    Set `status` on many blogs in one transaction. Everything is derived
+    from the UPDATEs themselves (one per previous status, with RETURNING),
+    so no row can change between a read and the write: the first UPDATE
+    takes the write lock. Only ids that no UPDATE matched are looked up,
+    to tell "unchanged" from "not_found".
+    Returns {id: "approved" | "rejected" | "unchanged" | "not_found"}.
+    """
+    ids = list(dict.fromkeys(ids))
+    now = datetime.utcnow()
+    # id -> (previous status, created_at) of the blogs that actually changed
+    changed: dict[int, tuple[BlogStatus, datetime]] = {}
+    deltas = Counter()
+    for old in BlogStatus:
+        if old == status:
+            continue
+        rows = db.execute(
+            update(Blog)
+            .where(Blog.id.in_(ids), Blog.status == old)
+            .values(status=status, updated_at=now)
+            .returning(Blog.id, Blog.created_at, Blog.author_id)
+        )
+        for blog_id, created_at, author_id in rows:
+            changed[blog_id] = (old, created_at)
+            blog_stats_crud.change(deltas, author_id, old, status)
+
+    rest = [blog_id for blog_id in ids if blog_id not in changed]
+    unchanged = {blog_id for (blog_id,) in db.query(Blog.id).filter(Blog.id.in_(rest))} if rest else set()
+    blog_stats_crud.apply(db, deltas)
     db.commit()
-    db.refresh(blog)
-    return blog
 
-def list_pending(db: Session) -> list[Blog]:
-    return (
-        db.query(Blog)
-        .filter(Blog.status == BlogStatus.pending)
-        .order_by(Blog.created_at.desc())
-        .all()
-    )
+    is_public = status == BlogStatus.approved
+    public_keys = []
+    for blog_id, (old, created_at) in changed.items():
+        blog_cache.pop(blog_id)
+        if is_public or old == BlogStatus.approved:
+            public_keys.append((created_at, blog_id))
+    if len(public_keys) > FEED_CACHE_CLEAR_THRESHOLD:
+        feed_cache.clear()
+    elif public_keys:
+        feed_cache.pop_where(lambda _, page: any(page.covers(k) for k in public_keys))
 
-def list_rejected(db: Session) -> list[Blog]:
-    return (
-        db.query(Blog)
-        .filter(Blog.status == BlogStatus.rejected)
-        .order_by(Blog.created_at.desc())
-        .all()
-    )
+    results = {}
+    for blog_id in ids:
+        if blog_id in changed:
+            results[blog_id] = status.value
+        elif blog_id in unchanged:
+            results[blog_id] = "unchanged"
+        else:
+            results[blog_id] = "not_found"
+    return results
+
+
+def approve_blog(db: Session, blog: Blog) -> Blog:
+    return _set_status(db, blog, BlogStatus.approved)
+
+
+def reject_blog(db: Session, blog: Blog) -> Blog:
+    return _set_status(db, blog, BlogStatus.rejected)
+
+def get_blog_rows(db: Session, blog_ids: list[int]) -> list[tuple]:
+    """BLOG_FIELDS row tuples for `blog_ids` (any status; missing ids are skipped)."""
+    return db.query(*_BLOG_COLUMNS).filter(Blog.id.in_(blog_ids)).all()
+
+
+def iter_approved_oldest_first(db: Session, after: tuple | None = None, batch_size: int = 1000):
+    """
+    Stream approved BLOG_FIELDS rows, oldest first; with `after`, only those
+    newer than that (created_at, id) key (a seek on the status index).
+    """
+    query = db.query(*_BLOG_COLUMNS).filter(Blog.status == BlogStatus.approved)
+    if after is not None:
+        query = query.filter(keyset_after((Blog.created_at, Blog.id), after, descending=False))
+    return query.order_by(Blog.created_at.asc(), Blog.id.asc()).yield_per(batch_size)
+
+
+def list_pending(
+    db: Session,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Sequence[str] = BLOG_FIELDS,
+) -> tuple[list[tuple], str | None]:
+    return _list_by_status(db, BlogStatus.pending, cursor, limit, fields)
+
+def list_rejected(
+    db: Session,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Sequence[str] = BLOG_FIELDS,
+) -> tuple[list[tuple], str | None]:
+    return _list_by_status(db, BlogStatus.rejected, cursor, limit, fields)
+
+
+def _fts_query(q: str) -> str:
+    """
+    User input -> FTS5 MATCH expression: every word becomes a quoted
+    phrase (so operators / punctuation can't cause syntax errors),
+    and all words must match.
+    """
+    words = q.split()
+    return " ".join('"' + w.replace('"', '""') + '"' for w in words)
+
+
+_SEARCH_SQL = text(
+    f"""
+    SELECT b.id, b.title, b.author_id, u.username AS author_username, b.created_at,
+           snippet({FTS_TABLE}, -1, '[', ']', '…', 16) AS snippet,
+           {FTS_TABLE}.rank AS score
+    FROM {FTS_TABLE}
+    JOIN blogs AS b ON b.id = {FTS_TABLE}.rowid
+    JOIN users AS u ON u.id = b.author_id
+    WHERE {FTS_TABLE} MATCH :query AND b.status = 'approved'
+      AND (:after_rank IS NULL
+           OR {FTS_TABLE}.rank > :after_rank
+           OR ({FTS_TABLE}.rank = :after_rank AND {FTS_TABLE}.rowid > :after_id))
+    ORDER BY {FTS_TABLE}.rank, {FTS_TABLE}.rowid
+    LIMIT :limit
+    """
+)
+
+
+def search_approved(
+    db: Session,
+    q: str,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> tuple[list[BlogSearchHit], str | None]:
+    """
+    BM25-ranked full-text search over approved blogs (SQLite FTS5).
+    The cursor is the (rank, rowid) of the last hit, so a later page
+    skips the earlier hits by comparison instead of OFFSET; it carries no
+    snippets for them either. Ranks move as the index changes, so deep
+    pages are approximate under concurrent edits, as they were with offsets.
+    """
+    query = _fts_query(q)
+    if not query:
+        return [], None
+    after_rank, after_id = decode_cursor(cursor, float, int) if cursor else (None, None)
+
+    rows = db.execute(
+        _SEARCH_SQL,
+        {"query": query, "limit": limit + 1, "after_rank": after_rank, "after_id": after_id},
+    ).mappings().all()
+    hits = [
+        BlogSearchHit(
+            id=row["id"],
+            title=row["title"],
+            snippet=row["snippet"],
+            author_id=row["author_id"],
+            author_username=row["author_username"],
+            created_at=row["created_at"],
+            # bm25 is "lower is better"; flip it so higher means more relevant
+            score=-row["score"],
+        )
+        for row in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last["score"], last["id"])
+    return hits, next_cursor
@@ -0,0 +1,115 @@
+"""
+Maintained per-(author, status) blog counters.
+
+Every function in blog_crud that creates, deletes or changes the status
+of a blog passes its deltas to `apply` before committing, so the
+counters change in the same transaction.
+"""
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.model.blog import Blog, BlogStatus
+from app.model.blog_stats import ALL_AUTHORS, BlogStatusCount, backfill_counts
+from app.schemas.blog import AuthorBlogCounts, BlogStats
+
+
+def change(deltas: Counter, author_id: int, old: BlogStatus | None, new: BlogStatus | None) -> Counter:
+    """Record one blog moving from `old` to `new` (None = not there)."""
+    if old == new:
+        return deltas
+    for author in (author_id, ALL_AUTHORS):
+        if old is not None:
+            deltas[(author, old)] -= 1
+        if new is not None:
+            deltas[(author, new)] += 1
+    return deltas
+
+
+def _upsert(dialect_name: str, deltas: Counter):
+    """INSERT ... ON CONFLICT DO UPDATE SET count = count + delta, one row per key."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    rows = [
+        {"author_id": author_id, "status": status, "count": delta}
+        for (author_id, status), delta in deltas.items()
+        if delta
+    ]
+    stmt = insert(BlogStatusCount)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[BlogStatusCount.author_id, BlogStatusCount.status],
+        set_={"count": BlogStatusCount.count + stmt.excluded.count},
+    )
+    return stmt, rows
+
+
+def apply(db: Session, deltas: Counter) -> None:
+    """Add `deltas` to the counters; the caller commits."""
+    stmt, rows = _upsert(db.get_bind().dialect.name, deltas)
+    if rows:
+        db.execute(stmt, rows)
+
+
+def total(db: Session, status: BlogStatus) -> int:
+    """Blogs in `status` across all authors: one primary-key lookup."""
+    count = (
+        db.query(BlogStatusCount.count)
+        .filter(BlogStatusCount.author_id == ALL_AUTHORS, BlogStatusCount.status == status)
+        .scalar()
+    )
+    return count or 0
+
+
+def get_stats(db: Session) -> BlogStats:
+    """
+    Totals and per-author counts come from the counters table only.
+    The oldest pending blog is min(created_at) over the
+    (status, created_at, id) index: one seek, no table scan.
+    """
+    totals = {status: 0 for status in BlogStatus}
+    authors: dict[int, dict[BlogStatus, int]] = {}
+    for author_id, status, count in db.query(
+        BlogStatusCount.author_id, BlogStatusCount.status, BlogStatusCount.count
+    ).filter(BlogStatusCount.count != 0):
+        if author_id == ALL_AUTHORS:
+            totals[status] = count
+        else:
+            authors.setdefault(author_id, {s: 0 for s in BlogStatus})[status] = count
+
+    oldest_pending = (
+        db.query(func.min(Blog.created_at))
+        .filter(Blog.status == BlogStatus.pending)
+        .scalar()
+        if totals[BlogStatus.pending]
+        else None
+    )
+
+    return BlogStats(
+        pending=totals[BlogStatus.pending],
+        approved=totals[BlogStatus.approved],
+        rejected=totals[BlogStatus.rejected],
+        oldest_pending_at=oldest_pending,
+        oldest_pending_age_seconds=(
+            (datetime.utcnow() - oldest_pending).total_seconds() if oldest_pending else None
+        ),
+        authors=[
+            AuthorBlogCounts(
+                author_id=author_id,
+                pending=counts[BlogStatus.pending],
+                approved=counts[BlogStatus.approved],
+                rejected=counts[BlogStatus.rejected],
+            )
+            for author_id, counts in sorted(authors.items())
+        ],
+    )
+
+
+def rebuild(db: Session) -> None:
+    """Recompute all counters from the blogs table (maintenance / repair)."""
+    backfill_counts(db.connection())
+    db.commit()
@@ -0,0 +1,25 @@
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.model.chat_message import ChatMessage
+
+
+def insert_messages(db: Session, rows: list[dict]) -> None:
+    """One executemany INSERT + one commit for a whole batch."""
+    db.execute(insert(ChatMessage), rows)
+    db.commit()
+
+
+async def list_messages(
+    db: AsyncSession,
+    blog_id: int,
+    before: int | None,
+    limit: int,
+) -> list[ChatMessage]:
+    """Newest first; `before` is the id of the oldest message the client has."""
+    query = select(ChatMessage).where(ChatMessage.blog_id == blog_id)
+    if before is not None:
+        query = query.where(ChatMessage.id < before)
+    result = await db.execute(query.order_by(ChatMessage.id.desc()).limit(limit))
+    return list(result.scalars().all())
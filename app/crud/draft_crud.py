@@ -1,33 +1,44 @@
 from sqlalchemy.orm import Session
 
 from app.model.draft import Draft
-from app.schemas.draft import DraftSave
 
 
 def get_draft_for_user(db: Session, user_id: int) -> Draft | None:
     return db.query(Draft).filter(Draft.user_id == user_id).first()
 
 
-def save_or_update_draft(
-    db: Session,
-    user_id: int,
-    data: DraftSave,
-) -> Draft:
-    draft = get_draft_for_user(db, user_id)
-    if draft is None:
-        draft = Draft(
-            user_id=user_id,
-            title=data.title,
-            content=data.content,
-        )
-        db.add(draft)
-        db.commit()
-        db.refresh(draft)
-        return draft
-
-    draft.title = data.title
-    draft.content = data.content
+def _dialect_insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
 
+
+def upsert_drafts(db: Session, rows: list[dict]) -> set[int]:
+    """
+    INSERT ... ON CONFLICT(user_id) DO UPDATE for a batch of drafts
+    (dicts with user_id, title, content, revision, updated_at): one
+    statement, one commit, no SELECT first. A row already at a newer
+    revision (written by another worker) is left alone.
+
+    Returns the user_ids actually written; the missing ones were skipped.
+    """
+    if not rows:
+        return set()
+    insert = _dialect_insert(db)
+    stmt = insert(Draft)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Draft.user_id],
+        set_={
+            "title": stmt.excluded.title,
+            "content": stmt.excluded.content,
+            "revision": stmt.excluded.revision,
+            "updated_at": stmt.excluded.updated_at,
+        },
+        where=Draft.revision < stmt.excluded.revision,
+    ).returning(Draft.user_id)
+    written = set(db.execute(stmt, rows).scalars())
     db.commit()
-    db.refresh(draft)
-    return draft
+    return written
+
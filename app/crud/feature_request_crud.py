@@ -1,7 +1,25 @@
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.serialization import fields_of
+from app.crud.pagination import (
+    DEFAULT_PAGE_SIZE,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_after,
+    page_columns,
+)
 from app.model.feature_request import FeatureRequest, FeatureRequestStatus
-from app.schemas.feature_request import FeatureRequestCreate, FeatureRequestUpdateStatus
+from app.schemas.feature_request import (
+    FeatureRequestCreate,
+    FeatureRequestOut,
+    FeatureRequestSort,
+    FeatureRequestUpdateStatus,
+)
 
 
 def create_feature_request(
@@ -22,12 +40,103 @@ def create_feature_request(
     return fr
 
 
-def list_feature_requests(db: Session) -> list[FeatureRequest]:
-    return (
-        db.query(FeatureRequest)
-        .order_by(FeatureRequest.created_at.desc())
-        .all()
-    )
+# List queries select the FeatureRequestOut columns (or the requested
+# subset of them), as plain row tuples
+FEATURE_REQUEST_FIELDS = fields_of(FeatureRequestOut)
+
+# sort name -> key columns (all DESC); id breaks ties so the key is unique.
+# rating is nullable: unrated requests sort last, as rating -1.
+_SORT_KEYS = {
+    FeatureRequestSort.recent: (FeatureRequest.created_at, FeatureRequest.id),
+    FeatureRequestSort.priority: (FeatureRequest.priority, FeatureRequest.created_at, FeatureRequest.id),
+    FeatureRequestSort.rating: (
+        func.coalesce(FeatureRequest.rating, -1),
+        FeatureRequest.created_at,
+        FeatureRequest.id,
+    ),
+}
+# the row attributes the next cursor is built from
+_SORT_FIELDS = {
+    FeatureRequestSort.recent: ("created_at", "id"),
+    FeatureRequestSort.priority: ("priority", "created_at", "id"),
+    FeatureRequestSort.rating: ("rating", "created_at", "id"),
+}
+_SORT_PARSERS = {
+    FeatureRequestSort.recent: (datetime.fromisoformat, int),
+    FeatureRequestSort.priority: (int, datetime.fromisoformat, int),
+    FeatureRequestSort.rating: (int, datetime.fromisoformat, int),
+}
+
+
+def list_feature_requests(
+    db: Session,
+    *,
+    status: FeatureRequestStatus | None = None,
+    min_priority: int | None = None,
+    max_priority: int | None = None,
+    user_id: int | None = None,
+    min_rating: int | None = None,
+    max_rating: int | None = None,
+    sort: FeatureRequestSort = FeatureRequestSort.recent,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Sequence[str] = FEATURE_REQUEST_FIELDS,
+) -> tuple[list[tuple], str | None]:
+    """
+    Filtered keyset pagination, highest / newest first.
+    The triage view (status + priority sort) is an index range scan on
+    (status, priority, created_at); "my requests" on (user_id, created_at).
+    The cursor embeds the sort, so it can't be replayed under another one.
+    Returns row tuples starting with the `fields` columns (the sort key
+    columns follow if not among them).
+    Raises InvalidCursor for a cursor we did not issue.
+    """
+    query = db.query(*page_columns(FeatureRequest, fields, _SORT_FIELDS[sort]))
+    if status is not None:
+        query = query.filter(FeatureRequest.status == status)
+    if user_id is not None:
+        query = query.filter(FeatureRequest.user_id == user_id)
+    if min_priority is not None:
+        query = query.filter(FeatureRequest.priority >= min_priority)
+    if max_priority is not None:
+        query = query.filter(FeatureRequest.priority <= max_priority)
+    if min_rating is not None:
+        query = query.filter(FeatureRequest.rating >= min_rating)
+    if max_rating is not None:
+        query = query.filter(FeatureRequest.rating <= max_rating)
+
+    columns = _SORT_KEYS[sort]
+    if cursor:
+        cursor_sort, *values = decode_cursor(cursor, str, *_SORT_PARSERS[sort])
+        if cursor_sort != sort.value:
+            raise InvalidCursor(cursor)
+        query = query.filter(keyset_after(columns, values))
+
+    # fetch one extra row to know whether there is a next page
+    rows = query.order_by(*(c.desc() for c in columns)).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    key = {
+        FeatureRequestSort.recent: (),
+        FeatureRequestSort.priority: (last.priority,),
+        FeatureRequestSort.rating: (last.rating if last.rating is not None else -1,),
+    }[sort]
+    return rows, encode_cursor(sort.value, *key, last.created_at, last.id)
+
+
+def collection_version(db: Session) -> tuple[datetime | None, int]:
+    """
+    (max(updated_at), max(id)) over all feature requests, for ETags: two
+    index seeks rather than a count over every row. Every create and
+    status change moves updated_at; there is no delete endpoint (add a
+    counter before adding one, max(id) wouldn't notice).
+    """
+    last_modified = db.query(func.max(FeatureRequest.updated_at)).scalar()
+    last_id = db.query(func.max(FeatureRequest.id)).scalar()
+    return last_modified, last_id or 0
 
 
 def get_feature_request(db: Session, fr_id: int) -> FeatureRequest | None:
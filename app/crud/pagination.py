@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Opaque cursor for keyset pagination.
+    It is just the sort key of the last row on a page, base64url-encoded.
+    """
+    raw = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    data = json.dumps(raw, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> list[Any]:
+    """
+    Reverse of `encode_cursor`. One parser per key column,
+    e.g. decode_cursor(c, datetime.fromisoformat, int).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(raw, list) or len(raw) != len(parsers):
+            raise InvalidCursor(cursor)
+        return [parse(value) for parse, value in zip(parsers, raw)]
+    except InvalidCursor:
+        raise
+    except Exception as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any], descending: bool = True):
+    """
+    WHERE clause selecting the rows that come after `values` in
+    ORDER BY columns (all DESC, or all ASC).
+
+    (a, b) after (x, y)  ==  a < x OR (a = x AND b < y)   for DESC
+    """
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        step = column < value if descending else column > value
+        equal = [c == v for c, v in zip(columns[:i], values[:i])]
+        clauses.append(and_(*equal, step) if equal else step)
+    return or_(*clauses)
+
+
+def page_columns(model, fields: Sequence[str], keys: Sequence[str] = ("created_at", "id")) -> tuple:
+    """
+    Columns to SELECT for a page of `fields` (a sparse fieldset): those,
+    then whichever keyset `keys` the next cursor needs but weren't asked
+    for. The extras come last, so encode_rows(fields, rows) leaves them out.
+    """
+    names = tuple(fields) + tuple(key for key in keys if key not in fields)
+    return tuple(getattr(model, name) for name in names)
@@ -1 +1,13 @@
-from app.db.session import Base, engine, SessionLocal, get_db  # re-export
+from app.db.session import (  # re-export
+    Base,
+    engine,
+    SessionLocal,
+    get_db,
+    read_engine,
+    ReadSessionLocal,
+    get_read_db,
+    async_engine,
+    AsyncSessionLocal,
+    get_async_db,
+    run_write,
+)
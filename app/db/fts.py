@@ -0,0 +1,80 @@
+"""
+SQLite FTS5 index over approved blogs (blogs_fts).
+
+External-content table: the index stores only tokens and reads title /
+content back from `blogs` by rowid, so the text is not duplicated.
+Triggers keep it in sync with every INSERT / UPDATE / DELETE on blogs,
+including bulk statements that bypass the ORM; only rows whose status is
+'approved' are indexed.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+FTS_TABLE = "blogs_fts"
+
+_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title,
+        content,
+        content='blogs',
+        content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    # title matches weigh 10x content matches; `ORDER BY rank` uses this
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_ai AFTER INSERT ON blogs
+    WHEN new.status = 'approved'
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_ad AFTER DELETE ON blogs
+    WHEN old.status = 'approved'
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    # one trigger, delete-then-insert, so the order of the two steps is fixed
+    f"""
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_au AFTER UPDATE OF title, content, status ON blogs
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content)
+        SELECT 'delete', old.id, old.title, old.content WHERE old.status = 'approved';
+        INSERT INTO {FTS_TABLE}(rowid, title, content)
+        SELECT new.id, new.title, new.content WHERE new.status = 'approved';
+    END
+    """,
+]
+
+
+def create_search_index(connection: Connection) -> None:
+    """Create the FTS table and its triggers (idempotent)."""
+    for statement in _CREATE:
+        connection.execute(text(statement))
+
+
+def drop_search_index(connection: Connection) -> None:
+    # the triggers belong to `blogs` and go away with it
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+def rebuild_search_index(connection: Connection) -> int:
+    """
+    (Re)index every approved blog, e.g. for a database created before
+    search existed. Returns the number of indexed blogs.
+    """
+    create_search_index(connection)
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"))
+    result = connection.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, content) "
+            "SELECT id, title, content FROM blogs WHERE status = 'approved'"
+        )
+    )
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+    return result.rowcount
@@ -0,0 +1,131 @@
+"""
+Schema bootstrap (no Alembic yet).
+
+SQLite stores SCHEMA_VERSION in `PRAGMA user_version`. On startup
+`ensure_schema` reads that one integer; only when it is behind does it
+create missing tables / indexes / the search index, run the column
+additions below and stamp the new version. Bump SCHEMA_VERSION whenever
+a model gains a table, index or column.
+
+New columns on existing tables need an explicit step in upgrade_schema
+(ALTER TABLE ... ADD COLUMN plus any backfill); there is no general
+migration support.
+"""
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+
+
+class SchemaOutdated(RuntimeError):
+    pass
+
+
+def schema_version(connection: Connection) -> int:
+    return connection.execute(text("PRAGMA user_version")).scalar()
+
+
+def _add_blog_excerpt(connection: Connection, batch_size: int = 1000) -> None:
+    """v2: blogs.excerpt, backfilled from content in id order."""
+    from app.model.blog import EXCERPT_LENGTH, make_excerpt
+
+    if "excerpt" in {column["name"] for column in inspect(connection).get_columns("blogs")}:
+        return
+    connection.execute(
+        text(f"ALTER TABLE blogs ADD COLUMN excerpt VARCHAR({EXCERPT_LENGTH + 1}) NOT NULL DEFAULT ''")
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            text("SELECT id, content FROM blogs WHERE id > :last ORDER BY id LIMIT :n"),
+            {"last": last_id, "n": batch_size},
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            text("UPDATE blogs SET excerpt = :excerpt WHERE id = :id"),
+            [{"id": row.id, "excerpt": make_excerpt(row.content)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def _add_draft_revision(connection: Connection) -> None:
+    """
+    v3: drafts.revision and one draft per user (the autosave upsert's
+    ON CONFLICT target). Tables from before either change keep the
+    newest draft of each user.
+    """
+    inspector = inspect(connection)
+    if "revision" not in {column["name"] for column in inspector.get_columns("drafts")}:
+        connection.execute(text("ALTER TABLE drafts ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"))
+
+    unique = [c["column_names"] for c in inspector.get_unique_constraints("drafts")]
+    unique += [i["column_names"] for i in inspector.get_indexes("drafts") if i["unique"]]
+    if ["user_id"] in unique:
+        return
+    connection.execute(
+        text(
+            "DELETE FROM drafts WHERE id NOT IN ("
+            "  SELECT (SELECT d.id FROM drafts AS d WHERE d.user_id = u.user_id"
+            "          ORDER BY d.updated_at DESC, d.id DESC LIMIT 1)"
+            "  FROM (SELECT DISTINCT user_id FROM drafts) AS u)"
+        )
+    )
+    connection.execute(text("CREATE UNIQUE INDEX uq_drafts_user_id ON drafts (user_id)"))
+
+
+def upgrade_schema(connection: Connection) -> None:
+    """Create whatever is missing (idempotent) and stamp SCHEMA_VERSION."""
+    import app.model  # noqa: F401  (registers every table on Base.metadata)
+    from app.db.fts import FTS_TABLE, rebuild_search_index
+    from app.db.session import Base
+
+    Base.metadata.create_all(bind=connection)
+    _add_blog_excerpt(connection)
+    _add_draft_revision(connection)
+    # create_all skips tables that exist, and with them any index added since
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+    if connection.dialect.name == "sqlite":
+        if not inspect(connection).has_table(FTS_TABLE):
+            rebuild_search_index(connection)
+        connection.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+
+
+def ensure_schema(engine: Engine, create: bool = True) -> None:
+    """
+    Cheap startup check. With `create` False an outdated database is an
+    error (run `python -m app.manage init-db`) instead of being upgraded.
+    Other databases have no user_version; there `create` runs create_all.
+    """
+    if engine.dialect.name != "sqlite":
+        if create:
+            with engine.begin() as connection:
+                upgrade_schema(connection)
+        return
+
+    with engine.connect() as connection:
+        current = schema_version(connection)
+    if current == SCHEMA_VERSION:
+        return
+    if not create:
+        raise SchemaOutdated(
+            f"database schema is at version {current}, expected {SCHEMA_VERSION}; "
+            "run `python -m app.manage init-db`"
+        )
+
+    logger.info("upgrading database schema %s -> %s", current, SCHEMA_VERSION)
+    try:
+        with engine.begin() as connection:
+            upgrade_schema(connection)
+    except Exception:
+        # another worker starting at the same time may have won the race
+        with engine.connect() as connection:
+            if schema_version(connection) != SCHEMA_VERSION:
+                raise
@@ -1,25 +1,197 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.core.config import settings
 
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+def sqlite_pragmas(read_only: bool = False) -> list[str]:
+    """PRAGMAs run on every new connection under the production profile."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}",
+        # negative = size in KiB rather than pages
+        f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KIB}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # WAL is persistent in the file; readers no longer block on the writer
+        pragmas += ["PRAGMA journal_mode = WAL", f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}"]
+    return pragmas
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args=connect_args,
+
+def apply_pragmas(engine: Engine, pragmas: list[str]) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def make_engine(url: str, read_only: bool = False, profile: str | None = None) -> Engine:
+    """
+    Sync engine for `url`. For SQLite under the "production" profile:
+    - writer (read_only=False): a single pooled connection whose transactions
+      start with BEGIN IMMEDIATE, so in-process writers queue on the pool
+      instead of failing lock upgrades with "database is locked";
+    - reader (read_only=True): a pool of query_only connections that, with
+      WAL, never wait for the writer.
+    """
+    profile = profile or settings.SQLITE_PROFILE
+    if not url.startswith("sqlite"):
+        return create_engine(url)
+    if profile != "production":
+        return create_engine(url, connect_args={"check_same_thread": False})
+
+    if read_only:
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            pool_size=settings.SQLITE_READ_POOL_SIZE,
+            max_overflow=settings.SQLITE_READ_POOL_SIZE,
+        )
+        apply_pragmas(engine, sqlite_pragmas(read_only=True))
+        return engine
+
+    engine = create_engine(
+        url,
+        # isolation_level=None: pysqlite no longer emits its own BEGIN,
+        # the "begin" hook below does
+        connect_args={"check_same_thread": False, "isolation_level": None},
+        pool_size=1,
+        max_overflow=0,
+    )
+    apply_pragmas(engine, sqlite_pragmas())
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return engine
+
+
+engine = make_engine(settings.DATABASE_URL)
+if settings.DATABASE_URL.startswith("sqlite") and settings.SQLITE_PROFILE == "production":
+    read_engine = make_engine(settings.DATABASE_URL, read_only=True)
+else:
+    read_engine = engine
+
+
+
+class RoutingSession(Session):
+    """
+    Session that only touches the writer once it writes.
+
+    Queries go to `reader` until the transaction's first write (a flush,
+    or an INSERT/UPDATE/DELETE statement); from then until commit or
+    rollback everything runs on `writer`, so the transaction reads its own
+    writes. A request therefore holds the single writer connection (and,
+    under the production profile, its BEGIN IMMEDIATE lock) only from its
+    first write to its commit, not while it loads, checks or serializes.
+    Check-then-write code must make the write conditional on what it read
+    (see blog_crud._set_status).
+    """
+
+    def __init__(self, writer: Engine, reader: Engine, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.writer = writer
+        self.reader = reader
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get("writing") or self._flushing or isinstance(clause, UpdateBase):
+            return self.writer
+        return self.reader
+
+    def connection(self, bind_arguments=None, **kwargs):
+        # an explicit connection is for raw writes (backfills, repairs)
+        bind_arguments = {"bind": self.writer, **(bind_arguments or {})}
+        return super().connection(bind_arguments=bind_arguments, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _writer_joined(session, transaction, connection):
+    if connection.engine is session.writer:
+        session.info["writing"] = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _writer_released(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("writing", None)
+
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    writer=engine,
+    reader=read_engine,
+    autocommit=False,
+    autoflush=False,
 )
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+def to_async_url(url: str) -> str:
+    """
+    Map a sync DATABASE_URL onto its asyncio driver,
+    e.g. sqlite:///./dev.db -> sqlite+aiosqlite:///./dev.db
+    """
+    scheme, sep, rest = url.partition("://")
+    if "+" in scheme:
+        scheme = scheme.split("+", 1)[0]
+    driver = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}.get(scheme, scheme)
+    return f"{driver}{sep}{rest}"
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async path for `async def` endpoints, so they never block the event loop
+# (and with it every SSE stream and WebSocket chat in the worker).
+# Reads only: a second writer connection would race the serialized one
+# above, so async code hands its writes to `run_write` instead. Under the
+# production profile it is query_only, like the reader pool.
+async_engine = create_async_engine(to_async_url(settings.DATABASE_URL))
+if settings.DATABASE_URL.startswith("sqlite") and settings.SQLITE_PROFILE == "production":
+    apply_pragmas(async_engine.sync_engine, sqlite_pragmas(read_only=True))
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 Base = declarative_base()
 
 
 def get_db():
+    """RoutingSession: reads on the reader pool, the writer only for writes."""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session for read-only endpoints (GETs); writes through it fail."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """AsyncSession for reads; see `run_write` for writes from async code."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_write(fn, db: Session, *args):
+    """
+    `fn(db, *args)` in the threadpool, for `async def` endpoints: their
+    writes take the same serialized writer as the sync ones (`db` comes
+    from get_db).
+    """
+    return await run_in_threadpool(fn, db, *args)
@@ -1,44 +1,123 @@
-from fastapi import Depends, HTTPException, status
+import time
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.ratelimit import RateLimit, TokenBucketLimiter, retry_after_header
 from app.core.security import decode_token
-from app.db import get_db
+from app.db import AsyncSessionLocal
 from app.model import User, Role
 
 # NOTE: tokenUrl must match the actual login endpoint path
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    The authenticated caller, as seen by endpoints.
+    A plain snapshot of the user row, so it can be cached across requests.
+    """
+    id: int
+    username: str
+    email: str
+    role: Role
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            role=user.role,
+            is_active=bool(user.is_active),
+        )
+
+
+# token -> decoded claims (skips the HMAC check on repeat requests)
+_claims_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+# token subject (username) -> Principal (skips the users-table query)
+principal_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+# sessions for principal cache misses only; swapped in tests, like get_async_db
+principal_session_factory = AsyncSessionLocal
+
+
+def invalidate_principal(username: str) -> None:
+    """
+    Call after changing a user's role or is_active, so the change applies
+    to their next request. Other workers pick it up once the TTL expires.
+    """
+    principal_cache.pop(username)
+
+
 def get_user_by_username(db: Session, username: str) -> User | None:
     return db.query(User).filter(User.username == username).first()
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials.",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def get_user_by_username_async(db: AsyncSession, username: str) -> User | None:
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+
+def decode_token_cached(token: str) -> dict:
+    """decode_token, memoized per token until the cache TTL or the token's exp."""
+    claims = _claims_cache.get(token)
+    if claims is None or claims.get("exp", 0) <= time.time():
+        claims = decode_token(token)  # raises on bad signature / expiry
+        _claims_cache.set(token, claims)
+    return claims
+
+
+async def resolve_principal(db: AsyncSession | None, token: str) -> Principal | None:
+    """
+    Token -> active Principal, or None if the token or user is not valid.
+    In steady state this is two dict lookups and no database round-trip;
+    only a principal cache miss queries `db`, or without one a session
+    opened from `principal_session_factory` just for that.
+    """
     try:
-        payload = decode_token(token)
-        username: str | None = payload.get("sub")
-        if username is None:
-            raise credentials_exception
+        username: str | None = decode_token_cached(token).get("sub")
     except Exception:
-        raise credentials_exception
+        return None
+    if username is None:
+        return None
+
+    principal = principal_cache.get(username)
+    if principal is None:
+        generation = principal_cache.generation
+        if db is not None:
+            user = await get_user_by_username_async(db, username=username)
+        else:
+            async with principal_session_factory() as session:
+                user = await get_user_by_username_async(session, username=username)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.set(username, principal, generation=generation)
+
+    return principal if principal.is_active else None
+
 
-    user = get_user_by_username(db, username=username)
-    if user is None or not user.is_active:
-        raise credentials_exception
-    return user
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    principal = await resolve_principal(None, token)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
 
 
 def require_role(*roles: Role):
-    def _role_dep(current_user: User = Depends(get_current_user)) -> User:
+    def _role_dep(current_user: Principal = Depends(get_current_user)) -> Principal:
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -47,3 +126,53 @@ def require_role(*roles: Role):
         return current_user
 
     return _role_dep
+
+
+# -------------------------
+# Rate limiting
+# -------------------------
+
+rate_limiter = TokenBucketLimiter(settings.RATE_LIMIT_SHARDS, settings.RATE_LIMIT_MAX_KEYS)
+rate_limiter.enabled = settings.RATE_LIMIT_ENABLED
+
+LOGIN_PER_IP = RateLimit.parse(settings.RATE_LIMIT_LOGIN_PER_IP)
+# Keyed by username alone, on purpose: it caps guesses at one account from
+# any number of addresses. The flip side is that anyone can spend it, so an
+# account under attack is locked out of password logins for up to a period
+# (its tokens refill continuously); existing tokens keep working.
+LOGIN_PER_USERNAME = RateLimit.parse(settings.RATE_LIMIT_LOGIN_PER_USERNAME)
+REGISTER_PER_IP = RateLimit.parse(settings.RATE_LIMIT_REGISTER_PER_IP)
+BLOG_PER_USER = RateLimit.parse(settings.RATE_LIMIT_BLOG_PER_USER)
+CHAT_PER_USER = RateLimit.parse(settings.RATE_LIMIT_CHAT_PER_USER)
+
+
+def client_ip(request: Request) -> str:
+    # the peer address; behind a proxy run uvicorn with --proxy-headers
+    # (and --forwarded-allow-ips) so this is the real client
+    return request.client.host if request.client else "unknown"
+
+
+def enforce_rate_limit(name: str, limit: RateLimit, key) -> None:
+    """429 with Retry-After once `key` has used up its `name` budget."""
+    retry_after = rate_limiter.hit((name, key), limit)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please slow down.",
+            headers=retry_after_header(retry_after),
+        )
+
+
+def rate_limit_by_ip(name: str, limit: RateLimit):
+    # async: a check is microseconds, not worth a threadpool hop
+    async def _ip_limit(request: Request) -> None:
+        enforce_rate_limit(name, limit, client_ip(request))
+
+    return _ip_limit
+
+
+def rate_limit_by_user(name: str, limit: RateLimit):
+    async def _user_limit(current_user: Principal = Depends(get_current_user)) -> None:
+        enforce_rate_limit(name, limit, current_user.id)
+
+    return _user_limit
@@ -1,29 +1,87 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.core.config import settings
-from app.db import Base, engine
-from app.api import api_router
+from app.core.config import Settings, settings
+from app.core.hashing import HashingPoolBusy
+from app.core.metrics import MetricsMiddleware
+from app.core.security import hashing_pool
+from app.db import engine
+from app.db.schema import ensure_schema
+from app.api import api_router, metrics
+from app.api.responses import NEXT_CURSOR_HEADER
+from app.services.broker import broker
+from app.services.chat_history import chat_history
+from app.services.draft_autosave import draft_autosave
+from app.services.snapshots import snapshot_publisher
 
-# Create tables automatically in dev (no Alembic yet)
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_PREFIX}/openapi.json",
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # a PRAGMA user_version read when the schema is current
+    # (no Alembic yet; `python -m app.manage init-db` does it explicitly)
+    ensure_schema(engine, create=settings.DB_AUTO_CREATE)
+    # connect to the cross-worker pub/sub (no-op for the in-process broker)
+    await broker.start()
+    chat_history.start()
+    draft_autosave.start()
+    snapshot_publisher.start()
+    yield
+    await snapshot_publisher.stop()
+    await draft_autosave.stop()
+    await chat_history.stop()
+    await broker.stop()
+    # waits for in-flight hashes; off the loop so it can't stall other shutdown work
+    await asyncio.to_thread(hashing_pool.shutdown)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[str(o) for o in settings.CORS_ORIGINS] or ["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.include_router(api_router, prefix=settings.API_PREFIX)
+def hashing_pool_busy(request: Request, exc: HashingPoolBusy):
+    # login/register burst: shed load fast instead of queueing behind bcrypt
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server busy, please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
 
 
-@app.get("/")
 def health_check():
     return {"status": "ok"}
+
+
+def create_app(config: Settings = settings) -> FastAPI:
+    """
+    Build the ASGI app. Nothing here touches the database; the schema
+    check and background services run in `lifespan`.
+    Also usable as `uvicorn --factory app.main:create_app`.
+    """
+    app = FastAPI(
+        title=config.PROJECT_NAME,
+        openapi_url=f"{config.API_PREFIX}/openapi.json",
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[str(o) for o in config.CORS_ORIGINS] or ["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # readable by cross-origin JS: pagination and caching validators
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified", "Retry-After"],
+    )
+
+    if config.METRICS_ENABLED:
+        # outermost of ours, so it times CORS handling too
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics.router)
+
+    app.include_router(api_router, prefix=config.API_PREFIX)
+    app.add_exception_handler(HashingPoolBusy, hashing_pool_busy)
+    app.add_api_route("/", health_check, methods=["GET"])
+    return app
+
+
+app = create_app()
@@ -0,0 +1,68 @@
+"""
+Maintenance commands.
+
+    python -m app.manage init-db
+    python -m app.manage rebuild-search-index
+    python -m app.manage rebuild-blog-counters
+    python -m app.manage publish-snapshots
+"""
+import argparse
+
+from app.db import engine
+
+
+def init_db(args: argparse.Namespace) -> None:
+    from app.db.schema import SCHEMA_VERSION, upgrade_schema
+
+    with engine.begin() as connection:
+        upgrade_schema(connection)
+    print(f"Database schema is at version {SCHEMA_VERSION}.")
+
+
+def rebuild_search_index(args: argparse.Namespace) -> None:
+    from app.db.fts import rebuild_search_index as rebuild
+
+    with engine.begin() as connection:
+        count = rebuild(connection)
+    print(f"Indexed {count} approved blogs.")
+
+
+def rebuild_blog_counters(args: argparse.Namespace) -> None:
+    from app.db import SessionLocal
+    from app.crud import blog_stats_crud
+
+    with SessionLocal() as db:
+        blog_stats_crud.rebuild(db)
+        stats = blog_stats_crud.get_stats(db)
+    print(f"Counted {stats.pending} pending, {stats.approved} approved, {stats.rejected} rejected blogs.")
+
+
+def publish_snapshots(args: argparse.Namespace) -> None:
+    from app.services.snapshots import snapshot_publisher
+
+    if not snapshot_publisher.enabled:
+        raise SystemExit("SNAPSHOT_DIR is not set.")
+    count = snapshot_publisher.rebuild()
+    print(f"Published {count} approved blogs to {snapshot_publisher.directory}.")
+
+
+COMMANDS = {
+    "init-db": (init_db, "Create missing tables / indexes and stamp the schema version"),
+    "rebuild-search-index": (rebuild_search_index, "(Re)build the blog full-text search index"),
+    "rebuild-blog-counters": (rebuild_blog_counters, "Recompute the per-status blog counters"),
+    "publish-snapshots": (publish_snapshots, "Rebuild all static blog / feed snapshots"),
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        sub.add_parser(name, help=help_text)
+
+    args = parser.parse_args(argv)
+    COMMANDS[args.command][0](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from app.model.user import User, Role
 from app.model.blog import Blog, BlogStatus
+from app.model.blog_stats import BlogStatusCount
 from app.model.feature_request import FeatureRequest, FeatureRequestStatus  
 from app.model.draft import Draft
+from app.model.chat_message import ChatMessage
 
@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, Enum, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Enum, ForeignKey, DateTime, Index, event, select
+from sqlalchemy.orm import column_property, relationship, validates
 from datetime import datetime
 import enum
 
 from app.db import Base
 from app.db.session import SessionLocal
+from app.db.fts import create_search_index, drop_search_index
+from app.model.user import User
 
 
 class BlogStatus(str, enum.Enum):
@@ -13,12 +15,38 @@ class BlogStatus(str, enum.Enum):
     rejected = "rejected"
 
 
+# characters of content shown on feed cards
+EXCERPT_LENGTH = 200
+
+
+def make_excerpt(content: str) -> str:
+    """Whitespace-collapsed start of `content`, cut at a word boundary."""
+    text = " ".join(content.split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    cut = text[:EXCERPT_LENGTH].rsplit(" ", 1)[0] or text[:EXCERPT_LENGTH]
+    return cut + "…"
+
+
+def _default_excerpt(context) -> str:
+    # column default, so Core bulk inserts get one too
+    return make_excerpt(context.get_current_parameters()["content"])
+
+
 class Blog(Base):
     __tablename__ = "blogs"
+    __table_args__ = (
+        # feed / moderation lists: WHERE status = ? ORDER BY created_at DESC, id DESC
+        Index("ix_blogs_status_created_at_id", "status", "created_at", "id"),
+        # feed high-water mark for ETags: max(updated_at) WHERE status = ?
+        Index("ix_blogs_status_updated_at", "status", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
     content = Column(Text, nullable=False)
+    # precomputed from content on write, so lists never need to read it
+    excerpt = Column(String(EXCERPT_LENGTH + 1), nullable=False, default=_default_excerpt)
     status = Column(Enum(BlogStatus), default=BlogStatus.pending, nullable=False)
 
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -32,3 +60,27 @@ class Blog(Base):
     )
     # Relationship backref
     author = relationship("User")
+    # the author summary responses carry: a correlated primary-key lookup
+    # in the same SELECT as the blog (entity or column query), so a page
+    # of blogs never costs a query per author
+    author_username = column_property(
+        select(User.username).where(User.id == author_id).correlate_except(User).scalar_subquery()
+    )
+
+    @validates("content")
+    def _sync_excerpt(self, key, content):
+        self.excerpt = make_excerpt(content)
+        return content
+
+
+# Full-text search index (SQLite FTS5), created / dropped with the table
+@event.listens_for(Blog.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        create_search_index(connection)
+
+
+@event.listens_for(Blog.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        drop_search_index(connection)
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, Enum, event, text
+
+from app.db.session import Base
+from app.model.blog import BlogStatus
+
+# author_id of the row holding the totals over all authors
+ALL_AUTHORS = 0
+
+
+class BlogStatusCount(Base):
+    """
+    Number of blogs per (author, status), kept up to date by blog_crud in
+    the same transaction as the blog change itself. The author_id = 0 rows
+    are the site-wide totals, so the dashboard counts are primary-key reads.
+    """
+    __tablename__ = "blog_status_counts"
+
+    # no FK: ALL_AUTHORS is not a user
+    author_id = Column(Integer, primary_key=True)
+    status = Column(Enum(BlogStatus), primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+
+
+BACKFILL_SQL = [
+    "DELETE FROM blog_status_counts",
+    """
+    INSERT INTO blog_status_counts (author_id, status, count)
+    SELECT author_id, status, count(*) FROM blogs GROUP BY author_id, status
+    """,
+    f"""
+    INSERT INTO blog_status_counts (author_id, status, count)
+    SELECT {ALL_AUTHORS}, status, count(*) FROM blogs GROUP BY status
+    """,
+]
+
+
+def backfill_counts(connection) -> None:
+    """Recompute every counter from the blogs table (one scan)."""
+    for statement in BACKFILL_SQL:
+        connection.execute(text(statement))
+
+
+# A database that predates the counters gets them filled on the create_all
+# that adds the table. Hooked on the metadata, not the table: the table has
+# no FK to blogs, so it may be created before blogs exists.
+@event.listens_for(Base.metadata, "after_create")
+def _backfill(target, connection, tables=(), **kw):
+    if BlogStatusCount.__table__ in tables:
+        backfill_counts(connection)
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+
+from app.db.session import Base
+
+
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+    __table_args__ = (
+        # history pages: WHERE blog_id = ? AND id < ? ORDER BY id DESC
+        Index("ix_chat_messages_blog_id_id", "blog_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    blog_id = Column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # denormalized so history renders without a users join
+    username = Column(String(50), nullable=False)
+    body = Column(Text, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
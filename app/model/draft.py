@@ -11,11 +11,14 @@ class Draft(Base):
 
     id = Column(Integer, primary_key=True, index=True)
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # one draft per user; also the ON CONFLICT target of the autosave upsert
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
 
     # Basic draft info
     title = Column(Text, nullable=True)
     content = Column(Text, nullable=True)
+    # bumped on every save / patch; base for incremental (PATCH) edits
+    revision = Column(Integer, default=0, nullable=False)
 
     updated_at = Column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -1,7 +1,7 @@
 from datetime import datetime
 import enum
 
-from sqlalchemy import Column, Integer, String, Text, Enum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Enum, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -15,6 +15,13 @@ class FeatureRequestStatus(str, enum.Enum):
 
 class FeatureRequest(Base):
     __tablename__ = "feature_requests"
+    __table_args__ = (
+        # triage: WHERE status = ? [AND priority BETWEEN ..] ORDER BY priority DESC, created_at DESC
+        # (id, the rowid, is implicitly the last column of every SQLite index)
+        Index("ix_feature_requests_status_priority_created_at", "status", "priority", "created_at"),
+        # a submitter's requests, newest first
+        Index("ix_feature_requests_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False)
@@ -40,6 +47,7 @@ class FeatureRequest(Base):
         default=datetime.utcnow,
         onupdate=datetime.utcnow,
         nullable=False,
+        index=True,
     )
 
     user = relationship("User")
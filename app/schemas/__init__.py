@@ -4,5 +4,7 @@ from app.schemas.feature_request import (
     FeatureRequestCreate,
     FeatureRequestUpdateStatus,
     FeatureRequestOut,
+    FeatureRequestSort,
 )
-from app.schemas.draft import  DraftOut
\ No newline at end of file
+from app.schemas.draft import  DraftOut
+from app.schemas.chat import ChatMessageOut
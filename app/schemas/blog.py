@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from enum import Enum
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
@@ -25,11 +25,54 @@ class BlogUpdate(BaseModel):
 
 
 class BlogOut(BlogBase):
+    excerpt: str
     id: int
     status: BlogStatusEnum
     author_id: int
+    author_username: str
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class BlogSearchHit(BaseModel):
+    id: int
+    title: str
+    snippet: str
+    author_id: int
+    author_username: str
+    created_at: datetime
+    score: float
+
+
+class ModerationAction(str, Enum):
+    approve = "approve"
+    reject = "reject"
+
+
+class BlogModerate(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=5000)
+    action: ModerationAction
+
+
+class BlogModerateResult(BaseModel):
+    id: int
+    result: Literal["approved", "rejected", "unchanged", "not_found"]
+
+
+class AuthorBlogCounts(BaseModel):
+    author_id: int
+    pending: int
+    approved: int
+    rejected: int
+
+
+class BlogStats(BaseModel):
+    pending: int
+    approved: int
+    rejected: int
+    oldest_pending_at: Optional[datetime] = None
+    oldest_pending_age_seconds: Optional[float] = None
+    authors: List[AuthorBlogCounts]
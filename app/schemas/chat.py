@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ChatMessageOut(BaseModel):
+    # None while the message is still buffered, not yet written
+    id: int | None = None
+    blog_id: int
+    user_id: int
+    username: str
+    body: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 
 class DraftBase(BaseModel):
@@ -14,7 +14,42 @@ class DraftSave(DraftBase):
 
 
 class DraftOut(DraftBase):
+    revision: int = 0
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+class DraftEdit(BaseModel):
+    """
+    Replace field[start:end] with `text` (insert: start == end, delete: text == "").
+    Positions count Unicode code points (Python str indexes), not the
+    UTF-16 code units JavaScript strings and browser editors report: text
+    outside the BMP, e.g. emoji, must be converted by the client first.
+    """
+    field: Literal["title", "content"] = "content"
+    start: int = Field(ge=0)
+    end: int = Field(ge=0)
+    text: str = ""
+
+    @model_validator(mode="after")
+    def _check_range(self):
+        if self.end < self.start:
+            raise ValueError("end must be >= start")
+        return self
+
+
+class DraftPatch(BaseModel):
+    """
+    Edits against `base_revision`, applied in order; each edit's
+    positions refer to the text as left by the previous edit.
+    """
+    base_revision: int
+    edits: List[DraftEdit] = Field(max_length=1000)
+
+
+class DraftPatchResult(BaseModel):
+    # deliberately no content: the client already has it
+    revision: int
+    updated_at: datetime
@@ -11,6 +11,12 @@ class FeatureRequestStatusEnum(str, Enum):
     declined = "declined"
 
 
+class FeatureRequestSort(str, Enum):
+    recent = "recent"
+    priority = "priority"
+    rating = "rating"
+
+
 class FeatureRequestBase(BaseModel):
     title: str
     description: str
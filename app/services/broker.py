@@ -0,0 +1,205 @@
+"""
+Pub/sub between app processes, so SSE subscribers and chat rooms see each
+other's events when uvicorn runs with --workers N.
+
+Every message published on a channel is delivered to the handlers
+subscribed to that channel in every process, including the publisher,
+together with a per-channel sequence number (used as SSE event id).
+
+Backends, chosen by BROKER_URL:
+- memory://              single process (default, tests, dev)
+- unix:///path/to.sock   local hub over a Unix domain socket; run it with
+                         `python -m app.services.broker` next to the workers
+Another backend (e.g. Redis pub/sub) only needs to implement `Broker`
+and be added to `create_broker`.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[int, Dict[str, Any]], Awaitable[None]]
+
+
+class Broker(ABC):
+    def __init__(self) -> None:
+        self._handlers: Dict[str, List[Handler]] = {}
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def _dispatch(self, channel: str, seq: int, message: Dict[str, Any]) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                await handler(seq, message)
+            except Exception:
+                logger.exception("broker handler failed on channel %s", channel)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        ...
+
+
+class InProcessBroker(Broker):
+    """Direct in-process delivery; works without start()."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._seq: Dict[str, int] = {}
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        seq = self._seq.get(channel, 0) + 1
+        self._seq[channel] = seq
+        await self._dispatch(channel, seq, message)
+
+
+class UnixSocketBroker(Broker):
+    """
+    Client of a `BrokerHub`. Frames are newline-delimited JSON:
+    {"channel": ..., "message": ...} up, plus "seq" on the way down.
+    If the hub is unreachable, messages are delivered to this process only
+    and reconnection is retried in the background.
+    """
+
+    def __init__(self, path: str, reconnect_delay: float = 1.0) -> None:
+        super().__init__()
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._fallback = InProcessBroker()
+        self._fallback._handlers = self._handlers
+
+    async def start(self) -> None:
+        if self._reader_task is None:
+            self._reader_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self.path)
+                while line := await reader.readline():
+                    frame = json.loads(line)
+                    await self._dispatch(frame["channel"], frame["seq"], frame["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("broker hub %s unavailable: %s", self.path, exc)
+            self._writer = None
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        await self.start()
+        if self._writer is None:
+            await self._fallback.publish(channel, message)
+            return
+        frame = json.dumps({"channel": channel, "message": message}, separators=(",", ":"))
+        self._writer.write(frame.encode("utf-8") + b"\n")
+        await self._writer.drain()
+
+
+class BrokerHub:
+    """
+    Relay for UnixSocketBroker clients: stamps each message with the next
+    sequence number of its channel and forwards it to every client.
+    Sequences start at the current time in ms, so they keep increasing
+    across hub restarts.
+    """
+
+    # a client this far behind is dropped rather than buffered forever
+    MAX_CLIENT_BUFFER = 8 * 1024 * 1024
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._seq: Dict[str, int] = {}
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in list(self._clients):
+            writer.close()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients.add(writer)
+        try:
+            while line := await reader.readline():
+                frame = json.loads(line)
+                channel = frame["channel"]
+                seq = self._seq.get(channel) or int(time.time() * 1000)
+                self._seq[channel] = seq + 1
+                frame["seq"] = seq + 1
+                self._fan_out(json.dumps(frame, separators=(",", ":")).encode("utf-8") + b"\n")
+        except (ConnectionError, ValueError, KeyError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    def _fan_out(self, data: bytes) -> None:
+        for client in list(self._clients):
+            if client.transport.get_write_buffer_size() > self.MAX_CLIENT_BUFFER:
+                self._clients.discard(client)
+                client.close()
+                continue
+            client.write(data)
+
+
+def create_broker(url: str) -> Broker:
+    if url.startswith("memory://"):
+        return InProcessBroker()
+    if url.startswith("unix://"):
+        return UnixSocketBroker(url[len("unix://"):])
+    raise ValueError(f"Unsupported BROKER_URL: {url!r}")
+
+
+broker = create_broker(settings.BROKER_URL)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the local pub/sub hub for multi-worker deployments.")
+    default = settings.BROKER_URL[len("unix://"):] if settings.BROKER_URL.startswith("unix://") else None
+    parser.add_argument("--socket", default=default, required=default is None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info("broker hub listening on %s", args.socket)
+    asyncio.run(BrokerHub(args.socket).serve_forever())
+
+
+if __name__ == "__main__":
+    main()
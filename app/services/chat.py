@@ -1,42 +1,134 @@
-from typing import Dict, Set
+import asyncio
+from collections import OrderedDict, deque
+from typing import Dict, List
 
 from fastapi import WebSocket
 
+from app.core.config import settings
+from app.services.broker import Broker, InProcessBroker, broker
+
+# "Try Again Later": closed for falling too far behind
+CLOSE_TOO_SLOW = 1013
+
+
+class _Connection:
+    """One chat socket: its outbound queue and the task draining it."""
+
+    __slots__ = ("websocket", "queue", "writer")
+
+    def __init__(self, websocket: WebSocket, max_lag: int) -> None:
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_lag)
+        self.writer: asyncio.Task | None = None
+
 
 class BlogChatManager:
     """
-    Simple in-memory chat manager.
-    Keeps a set of WebSocket connections per blog_id.
+    In-memory chat manager.
+    Keeps the WebSocket connections of each blog_id.
+
+    broadcast() never awaits a socket: it drops the message into each
+    connection's bounded queue and a per-connection writer task sends it.
+    A slow client therefore only delays itself; once it is `max_lag`
+    messages behind it is disconnected.
+
+    Messages go through the broker, so a room spans all worker processes.
+    The last `tail_size` messages of recently active rooms are kept in
+    memory and replayed to new connections.
     """
 
-    def __init__(self) -> None:
-        self._connections: Dict[int, Set[WebSocket]] = {}
+    CHANNEL = "chat"
+    MAX_TAIL_ROOMS = 10000
+
+    def __init__(
+        self,
+        broker: Broker | None = None,
+        max_lag: int = 256,
+        tail_size: int = 50,
+    ) -> None:
+        self.max_lag = max_lag
+        self.tail_size = min(tail_size, max_lag)
+        self._connections: Dict[int, Dict[WebSocket, _Connection]] = {}
+        self._tails: OrderedDict[int, deque[str]] = OrderedDict()
+        self._broker = broker or InProcessBroker()
+        self._broker.subscribe(self.CHANNEL, self._deliver)
+
+    def room_sizes(self) -> Dict[int, int]:
+        return {blog_id: len(conns) for blog_id, conns in self._connections.items()}
+
+    def tail(self, blog_id: int) -> List[str]:
+        return list(self._tails.get(blog_id, ()))
+
+    def _remember(self, blog_id: int, message: str) -> None:
+        tail = self._tails.get(blog_id)
+        if tail is None:
+            tail = self._tails[blog_id] = deque(maxlen=self.tail_size)
+            if len(self._tails) > self.MAX_TAIL_ROOMS:
+                self._tails.popitem(last=False)
+        else:
+            self._tails.move_to_end(blog_id)
+        tail.append(message)
 
     async def connect(self, blog_id: int, websocket: WebSocket) -> None:
         await websocket.accept()
-        if blog_id not in self._connections:
-            self._connections[blog_id] = set()
-        self._connections[blog_id].add(websocket)
+        conn = _Connection(websocket, self.max_lag)
+        for message in self._tails.get(blog_id, ()):
+            conn.queue.put_nowait(message)
+        conn.writer = asyncio.create_task(self._write_loop(blog_id, conn))
+        self._connections.setdefault(blog_id, {})[websocket] = conn
 
     def disconnect(self, blog_id: int, websocket: WebSocket) -> None:
         conns = self._connections.get(blog_id)
         if not conns:
             return
-        if websocket in conns:
-            conns.remove(websocket)
+        conn = conns.pop(websocket, None)
+        if conn is not None and conn.writer is not None:
+            conn.writer.cancel()
         if not conns:
             self._connections.pop(blog_id, None)
 
     async def broadcast(self, blog_id: int, message: str) -> None:
-        conns = self._connections.get(blog_id, set())
-        to_remove = []
-        for ws in conns:
+        await self._broker.publish(self.CHANNEL, {"blog_id": blog_id, "message": message})
+
+    async def _deliver(self, seq: int, payload: dict) -> None:
+        blog_id, message = payload["blog_id"], payload["message"]
+        self._remember(blog_id, message)
+        conns = self._connections.get(blog_id)
+        if not conns:
+            return
+        lagging = []
+        for conn in conns.values():
             try:
-                await ws.send_text(message)
-            except Exception:
-                to_remove.append(ws)
-        for ws in to_remove:
-            conns.discard(ws)
+                conn.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                lagging.append(conn)
+        for conn in lagging:
+            self._evict(blog_id, conn)
+
+    def _evict(self, blog_id: int, conn: _Connection) -> None:
+        self.disconnect(blog_id, conn.websocket)
+        asyncio.create_task(self._close(conn.websocket))
+
+    async def _close(self, websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=CLOSE_TOO_SLOW)
+        except Exception:
+            pass
+
+    async def _write_loop(self, blog_id: int, conn: _Connection) -> None:
+        try:
+            while True:
+                message = await conn.queue.get()
+                await conn.websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # socket is gone; the receive loop will notice too
+            self.disconnect(blog_id, conn.websocket)
 
 
-blog_chat_manager = BlogChatManager()
+blog_chat_manager = BlogChatManager(
+    broker,
+    max_lag=settings.CHAT_MAX_LAG,
+    tail_size=settings.CHAT_TAIL_SIZE,
+)
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.crud import chat_crud
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class ChatHistory:
+    """
+    Write-behind persistence for chat messages.
+
+    record() only appends to an in-memory batch, so the WebSocket hot path
+    never waits on the database. The batch is written with one executemany
+    INSERT when it reaches `batch_size` rows or is older than
+    `flush_interval` seconds (checked on record() and by run() in the
+    background), and on shutdown.
+    A crash loses at most one unflushed batch.
+
+    Buffered messages are still readable: `recent()` returns a room's
+    newest ones, for history pages to merge in front of the database rows.
+    A batch whose INSERT fails is retried on later flushes, alone; after
+    `max_attempts` failures it is logged and put aside in `failed` instead.
+    """
+
+    MAX_FAILED_BATCHES = 100
+
+    def __init__(
+        self,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        max_attempts: int = 5,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        # swapped in tests, like the get_db dependency
+        self.session_factory = SessionLocal
+        self._pending: List[Dict[str, Any]] = []
+        self._oldest_pending = 0.0
+        # the batch being written (or waiting for a retry), still readable
+        self._inflight: List[Dict[str, Any]] = []
+        self._attempts = 0
+        self.failed: deque[List[Dict[str, Any]]] = deque(maxlen=self.MAX_FAILED_BATCHES)
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._runner: asyncio.Task | None = None
+
+    def record(self, blog_id: int, user_id: int, username: str, body: str) -> None:
+        if not self._pending:
+            self._oldest_pending = time.monotonic()
+        elif len(self._pending) >= self.max_pending:
+            # the database has been failing for a while: never grow without bound
+            del self._pending[0]
+        self._pending.append(
+            {
+                "blog_id": blog_id,
+                "user_id": user_id,
+                "username": username,
+                "body": body,
+                "created_at": datetime.utcnow(),
+            }
+        )
+        if len(self._pending) >= self.batch_size or (
+            time.monotonic() - self._oldest_pending >= self.flush_interval
+        ):
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def recent(self, blog_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Up to `limit` of the room's buffered (unwritten) messages, newest first."""
+        found: List[Dict[str, Any]] = []
+        for rows in (self._pending, self._inflight):
+            for row in reversed(rows):
+                if row["blog_id"] == blog_id:
+                    found.append(row)
+                    if len(found) == limit:
+                        return found
+        return found
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._inflight:
+                self._inflight, self._pending = self._pending, []
+                self._attempts = 0
+            rows = self._inflight
+            if not rows:
+                return
+            try:
+                # on the serialized writer, off the event loop
+                await asyncio.to_thread(self._write, rows)
+            except Exception:
+                self._attempts += 1
+                if self._attempts < self.max_attempts:
+                    logger.exception(
+                        "chat history flush failed (attempt %d); retrying %d messages",
+                        self._attempts,
+                        len(rows),
+                    )
+                    return
+                logger.exception(
+                    "chat history flush failed %d times; setting %d messages aside",
+                    self._attempts,
+                    len(rows),
+                )
+                self.failed.append(rows)
+            self._inflight = []
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        with self.session_factory() as db:
+            chat_crud.insert_messages(db, rows)
+
+    async def run(self) -> None:
+        """Background time trigger; started from the app lifespan."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+        await self.flush()
+
+
+chat_history = ChatHistory(
+    batch_size=settings.CHAT_HISTORY_BATCH_SIZE,
+    flush_interval=settings.CHAT_HISTORY_FLUSH_SECONDS,
+)
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Sequence
+
+from app.core.config import settings
+from app.crud import draft_crud
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class DraftConflict(Exception):
+    """A patch was based on an outdated revision."""
+
+    def __init__(self, revision: int) -> None:
+        super().__init__(revision)
+        self.revision = revision
+
+
+class DraftAutosave:
+    """
+    Write-coalescing layer in front of the drafts table.
+
+    Autosaves only replace the user's latest draft in memory; dirty drafts
+    are written with a single upsert batch every `flush_interval` seconds
+    (background task, plus a check on each save whose failure is only
+    logged) or right away on an explicit save. A burst of autosaves
+    therefore becomes one write.
+
+    Reads go through get() first, so users always see their latest draft.
+    Rows being written stay readable (`_inflight`) until their commit
+    lands, so a save or patch during a flush builds on them rather than
+    on the older stored row. State is per process: a crash loses at most
+    `flush_interval` seconds of autosaves, and with several workers each
+    one numbers revisions from what it last saw. A draft the upsert skips
+    because the stored row is already newer is dropped and counted in
+    `discarded`; an explicit flush of that user raises DraftConflict.
+    """
+
+    def __init__(self, flush_interval: float = 5.0) -> None:
+        self.flush_interval = flush_interval
+        # swapped in tests, like the get_db dependency
+        self.session_factory = SessionLocal
+        self._dirty: Dict[int, Dict[str, Any]] = {}
+        # taken out of _dirty by a flush whose commit hasn't landed yet
+        self._inflight: Dict[int, Dict[str, Any]] = {}
+        # bumped after every successful flush
+        self._flushes = 0
+        # drafts the upsert skipped because a newer revision was stored
+        self.discarded = 0
+        self._oldest_dirty = 0.0
+        self._lock = threading.Lock()
+        self._runner: asyncio.Task | None = None
+
+    def get(self, user_id: int) -> Dict[str, Any] | None:
+        with self._lock:
+            return self._pending(user_id)
+
+    def _pending(self, user_id: int) -> Dict[str, Any] | None:
+        # caller holds _lock
+        return self._dirty.get(user_id) or self._inflight.get(user_id)
+
+    def _load(self, user_id: int) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            row = draft_crud.get_draft_for_user(db, user_id)
+        finally:
+            db.close()
+        if row is None:
+            return {"user_id": user_id, "title": None, "content": None, "revision": 0, "updated_at": None}
+        return {
+            "user_id": user_id,
+            "title": row.title,
+            "content": row.content,
+            "revision": row.revision,
+            "updated_at": row.updated_at,
+        }
+
+    def _mutate(self, user_id: int, change: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply `change` to the user's current draft and mark the result dirty."""
+        while True:
+            with self._lock:
+                base, flushes = self._pending(user_id), self._flushes
+            if base is None:
+                base = self._load(user_id)
+            with self._lock:
+                # another request may have saved while we were loading
+                pending = self._pending(user_id)
+                if pending is not None:
+                    base = pending
+                elif self._flushes != flushes:
+                    # ... and had it flushed, possibly after our read: reload
+                    continue
+                draft = change(base)
+                draft["revision"] = base["revision"] + 1
+                draft["updated_at"] = datetime.utcnow()
+                if not self._dirty:
+                    self._oldest_dirty = time.monotonic()
+                self._dirty[user_id] = draft
+                overdue = time.monotonic() - self._oldest_dirty >= self.flush_interval
+                break
+        if overdue:
+            try:
+                self.flush()
+            except Exception:
+                # logged by flush; the rows stay buffered. The caller only
+                # buffered a draft, so the batch's failure isn't theirs.
+                pass
+        return draft
+
+    def save(self, user_id: int, title: str | None, content: str | None) -> Dict[str, Any]:
+        """Full replacement (the classic autosave)."""
+        return self._mutate(user_id, lambda base: {**base, "title": title, "content": content})
+
+    def patch(self, user_id: int, base_revision: int, edits: Sequence[Any]) -> Dict[str, Any]:
+        """
+        Apply position-based edits (objects with field, start, end, text)
+        made against `base_revision`. Raises DraftConflict if the draft has
+        moved on, ValueError if an edit is out of range.
+        """
+        def apply(base: Dict[str, Any]) -> Dict[str, Any]:
+            if base["revision"] != base_revision:
+                raise DraftConflict(base["revision"])
+            draft = dict(base)
+            for edit in edits:
+                value = draft[edit.field] or ""
+                if edit.end > len(value):
+                    raise ValueError(f"edit range {edit.start}:{edit.end} is outside {edit.field}")
+                draft[edit.field] = value[:edit.start] + edit.text + value[edit.end:]
+            return draft
+
+        return self._mutate(user_id, apply)
+
+    def flush(self, user_ids: Iterable[int] | None = None) -> int:
+        """
+        Persist dirty drafts (all, or just `user_ids`). Returns rows written.
+        Raises DraftConflict if one of `user_ids` was not written because
+        another worker stored a newer revision.
+        """
+        with self._lock:
+            if user_ids is None:
+                rows, self._dirty = list(self._dirty.values()), {}
+            else:
+                rows = [self._dirty.pop(uid) for uid in user_ids if uid in self._dirty]
+            if self._dirty:
+                self._oldest_dirty = time.monotonic()
+            for row in rows:
+                self._inflight[row["user_id"]] = row
+        if not rows:
+            return 0
+
+        try:
+            db = self.session_factory()
+            try:
+                written = draft_crud.upsert_drafts(db, rows)
+            finally:
+                db.close()
+        except Exception:
+            logger.exception("draft flush failed; keeping %d drafts", len(rows))
+            with self._lock:
+                self._release(rows)
+                for row in rows:
+                    # a newer autosave that arrived meanwhile wins
+                    self._dirty.setdefault(row["user_id"], row)
+                # retry after another interval, not on every save
+                self._oldest_dirty = time.monotonic()
+            raise
+        skipped = [row["user_id"] for row in rows if row["user_id"] not in written]
+        with self._lock:
+            self._release(rows)
+            self._flushes += 1
+            self.discarded += len(skipped)
+        if skipped:
+            logger.warning("draft flush skipped %d drafts with a newer stored revision: %s", len(skipped), skipped)
+            if user_ids is not None:
+                raise DraftConflict(self._load(skipped[0])["revision"])
+        return len(written)
+
+    def _release(self, rows: Sequence[Dict[str, Any]]) -> None:
+        # caller holds _lock; a later flush may have replaced the entry
+        for row in rows:
+            if self._inflight.get(row["user_id"]) is row:
+                del self._inflight[row["user_id"]]
+
+    async def run(self) -> None:
+        """Background time trigger; started from the app lifespan."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:
+                pass  # already logged; retried next interval
+
+    def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+        await asyncio.to_thread(self.flush)
+
+
+draft_autosave = DraftAutosave(flush_interval=settings.DRAFT_FLUSH_SECONDS)
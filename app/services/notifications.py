@@ -1,29 +1,132 @@
 import asyncio
-from typing import Any, Dict, List
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, List, Tuple
+
+from app.core.config import settings
+from app.services.broker import Broker, InProcessBroker, broker
+
+Event = Tuple[int, Dict[str, Any]]
+
+
+class SubscriberLagged(Exception):
+    """A subscriber fell further behind than the buffer holds (disconnect policy)."""
+
+
+class Subscriber:
+    """A cursor into the shared event buffer: the id of the last event it received."""
+
+    __slots__ = ("cursor", "wakeup", "live")
+
+    def __init__(self, cursor: int) -> None:
+        self.cursor = cursor
+        self.wakeup = asyncio.Event()
+        # False until the first read: a reconnect from a too-old Last-Event-ID
+        # gets the dropped marker even under the "disconnect" policy,
+        # otherwise it would be disconnected again on every retry
+        self.live = False
 
 
 class NotificationManager:
     """
-    Simple in-memory pub/sub for SSE.
-    Each subscriber gets its own asyncio.Queue.
+    In-memory pub/sub for SSE.
+
+    Events go into one shared, fixed-size ring buffer and get increasing
+    ids. Subscribers are just cursors into it, so a stalled client costs
+    no memory. A client whose cursor falls off the end of the buffer is
+    either skipped ahead with an `events_dropped` marker (lag_policy
+    "drop") or disconnected (lag_policy "disconnect").
+    Reconnecting clients resume from their Last-Event-ID.
+
+    Events travel through the broker, so every worker process buffers
+    the same events under the same ids (the broker's sequence numbers).
     """
 
-    def __init__(self) -> None:
-        self._subscribers: List[asyncio.Queue[Dict[str, Any]]] = []
+    CHANNEL = "notifications"
+
+    def __init__(
+        self,
+        broker: Broker | None = None,
+        buffer_size: int = 1000,
+        lag_policy: str = "drop",
+    ) -> None:
+        self._buffer: deque[Event] = deque(maxlen=buffer_size)
+        self._last_id = 0
+        self._lag_policy = lag_policy
+        self._subscribers: set[Subscriber] = set()
+        self._broker = broker or InProcessBroker()
+        self._broker.subscribe(self.CHANNEL, self._deliver)
 
-    async def connect(self) -> asyncio.Queue[Dict[str, Any]]:
-        queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue()
-        self._subscribers.append(queue)
-        return queue
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
 
-    def disconnect(self, queue: asyncio.Queue[Dict[str, Any]]) -> None:
-        if queue in self._subscribers:
-            self._subscribers.remove(queue)
+    async def connect(self, last_event_id: int | None = None) -> Subscriber:
+        # an id from the future (e.g. we restarted) means "from now on"
+        if last_event_id is None or last_event_id > self._last_id:
+            last_event_id = self._last_id
+        subscriber = Subscriber(cursor=last_event_id)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
 
     async def publish(self, event: Dict[str, Any]) -> None:
-        # fan-out to all subscribers
-        for queue in list(self._subscribers):
-            await queue.put(event)
+        await self._broker.publish(self.CHANNEL, event)
+
+    async def _deliver(self, event_id: int, event: Dict[str, Any]) -> None:
+        if event_id != self._last_id + 1:
+            # first event this process sees, or the hub restarted: ids are
+            # not contiguous with what we hold, so start a fresh buffer and
+            # let lagging subscribers get the events_dropped marker
+            for subscriber in self._subscribers:
+                if subscriber.cursor >= self._last_id:
+                    subscriber.cursor = event_id - 1
+            self._buffer.clear()
+        self._last_id = event_id
+        self._buffer.append((event_id, event))
+        for subscriber in self._subscribers:
+            subscriber.wakeup.set()
+
+    def _pending(self, subscriber: Subscriber) -> List[Event]:
+        if subscriber.cursor >= self._last_id:
+            return []
+
+        events: List[Event] = []
+        oldest_id = self._buffer[0][0]
+        if subscriber.cursor < oldest_id - 1:
+            if self._lag_policy == "disconnect" and subscriber.live:
+                raise SubscriberLagged()
+            missed = oldest_id - 1 - subscriber.cursor
+            # the marker reuses the id just before the buffer, so a
+            # reconnect with it as Last-Event-ID resumes from the oldest event
+            events.append((oldest_id - 1, {"type": "events_dropped", "missed": missed}))
+            subscriber.cursor = oldest_id - 1
+
+        events.extend(islice(self._buffer, subscriber.cursor - oldest_id + 1, None))
+        subscriber.cursor = self._last_id
+        return events
+
+    async def next_events(self, subscriber: Subscriber, timeout: float) -> List[Event]:
+        """
+        Events after the subscriber's cursor, waiting up to `timeout`
+        seconds for some to arrive. Returns [] on timeout.
+        """
+        subscriber.wakeup.clear()
+        events = self._pending(subscriber)
+        subscriber.live = True
+        if events:
+            return events
+        try:
+            await asyncio.wait_for(subscriber.wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return []
+        return self._pending(subscriber)
 
 
-notifier = NotificationManager()
+notifier = NotificationManager(
+    broker,
+    buffer_size=settings.SSE_BUFFER_SIZE,
+    lag_policy=settings.SSE_LAG_POLICY,
+)
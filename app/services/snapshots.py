@@ -0,0 +1,288 @@
+"""
+Static snapshots of the public read side, for a front proxy to serve.
+
+    <SNAPSHOT_DIR>/blogs/<id>.json[.gz]   body of GET /api/blogs/<id>
+    <SNAPSHOT_DIR>/feed/page-<n>.json[.gz] approved blogs, newest first
+    <SNAPSHOT_DIR>/feed/index.json[.gz]   {"page_size", "pages", "total", "published_at"}
+
+Feed pages are numbered from the oldest blog (page-1 holds the oldest
+`page_size` blogs, the last page the newest ones, possibly fewer), so a
+blog approved or removed only changes the page it falls in and the pages
+after it; with new posts that is just the last page or two. To find that
+page without counting, feed/.page-ends.json keeps the (created_at, id) of
+the newest blog on each full page: a bisect gives the page, and the
+rewrite seeks to the end of the page before it.
+
+Each file is written next to its final name and os.replace()d into place,
+so a reader sees either the old or the new snapshot, never a partial one.
+Publishes are serialized across worker processes by a lock file.
+"""
+import asyncio
+import bisect
+import fcntl
+import gzip
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Set
+
+import orjson
+
+from app.core.config import settings
+from app.core.serialization import encode_row, encode_rows
+from app.crud import blog_crud
+from app.db.session import ReadSessionLocal
+from app.model.blog import BlogStatus
+
+logger = logging.getLogger(__name__)
+
+
+def write_atomic(path: Path, data: bytes, gzipped: bool = True) -> None:
+    """Write `data` and (if `gzipped`) its gzip twin (`path` + ".gz"), each via rename."""
+    targets = [(path, data)]
+    if gzipped:
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        targets.append((path.with_name(path.name + ".gz"), compressed))
+    for target, payload in targets:
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, target)
+
+
+def remove(path: Path) -> None:
+    for target in (path, path.with_name(path.name + ".gz")):
+        try:
+            target.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SnapshotPublisher:
+    """
+    mark() records blog ids whose public state may have changed; the
+    background run() loop (or an explicit publish()) regenerates the
+    affected snapshots. A burst of approvals is published once.
+    Disabled (mark is a no-op) when `directory` is empty.
+    """
+
+    def __init__(self, directory: str, page_size: int = 20, flush_interval: float = 1.0) -> None:
+        self.directory = Path(directory) if directory else None
+        self.page_size = page_size
+        self.flush_interval = flush_interval
+        # only reads; swapped in tests, like the get_read_db dependency
+        self.session_factory = ReadSessionLocal
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+        # one publish at a time per process; _exclusive() adds the cross-process lock
+        self._publish_lock = threading.Lock()
+        # (file identity, page ends) of the last .page-ends.json read
+        self._ends_cache: tuple[tuple, list[tuple]] = ((), [])
+        self._runner: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def mark(self, *blog_ids: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._dirty.update(blog_ids)
+
+    def _blog_path(self, blog_id: int) -> Path:
+        return self.directory / "blogs" / f"{blog_id}.json"
+
+    def _page_path(self, page: int) -> Path:
+        return self.directory / "feed" / f"page-{page}.json"
+
+    def _published_key(self, blog_id: int) -> tuple | None:
+        """(created_at, id) of the currently published snapshot of a blog, if any."""
+        try:
+            published = orjson.loads(self._blog_path(blog_id).read_bytes())
+        except FileNotFoundError:
+            return None
+        return datetime.fromisoformat(published["created_at"]), blog_id
+
+    def _ends_path(self) -> Path:
+        return self.directory / "feed" / ".page-ends.json"
+
+    def _ensure_dirs(self) -> None:
+        (self.directory / "blogs").mkdir(parents=True, exist_ok=True)
+        (self.directory / "feed").mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the publish lock of this process and, via flock, of every other worker."""
+        with self._publish_lock:
+            self._ensure_dirs()
+            with open(self.directory / ".publish.lock", "a") as lock_file:
+                # released when the file is closed
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def _page_ends(self) -> list[tuple]:
+        """
+        (created_at, id) of the newest blog on each full feed page, as last
+        written by any process; empty (rewrite everything) if there is no
+        such file or it was written for another page size.
+        """
+        path = self._ends_path()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return []
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if self._ends_cache[0] != identity:
+            stored = orjson.loads(path.read_bytes())
+            ends = []
+            if stored["page_size"] == self.page_size:
+                ends = [(datetime.fromisoformat(key[0]), key[1]) for key in stored["ends"]]
+            self._ends_cache = (identity, ends)
+        return self._ends_cache[1]
+
+    def publish(self, blog_ids: Iterable[int] | None = None) -> int:
+        """
+        Regenerate snapshots for the marked blogs (or `blog_ids`) and the
+        feed pages they fall in or shift. Returns the number of blogs handled.
+        """
+        if not self.enabled:
+            return 0
+        with self._lock:
+            if blog_ids is None:
+                ids, self._dirty = self._dirty, set()
+            else:
+                ids = set(blog_ids)
+                self._dirty -= ids
+        if not ids:
+            return 0
+
+        try:
+            with self._exclusive():
+                db = self.session_factory()
+                try:
+                    self._publish(db, ids)
+                finally:
+                    db.close()
+        except Exception:
+            logger.exception("snapshot publish failed; will retry %d blogs", len(ids))
+            with self._lock:
+                self._dirty |= ids
+            raise
+        return len(ids)
+
+    def _publish(self, db, ids: Set[int]) -> None:
+        fields = blog_crud.BLOG_FIELDS
+        index = {name: i for i, name in enumerate(fields)}
+        rows = {row[index["id"]]: row for row in blog_crud.get_blog_rows(db, list(ids))}
+
+        # keys of blogs entering or leaving the feed
+        moved = []
+        for blog_id in ids:
+            row = rows.get(blog_id)
+            published = self._published_key(blog_id)
+            if row is not None and row[index["status"]] == BlogStatus.approved:
+                write_atomic(self._blog_path(blog_id), encode_row(fields, row))
+                moved.append((row[index["created_at"]], blog_id))
+            elif published is not None:
+                remove(self._blog_path(blog_id))
+                moved.append(published)
+
+        if moved:
+            ends = self._page_ends()
+            # a key past the end of page n - 1 falls in page n (or later)
+            first = min(bisect.bisect_left(ends, key) for key in moved) + 1
+            self._write_pages(db, first, ends[: first - 1])
+
+    def _write_pages(self, db, first_page: int, ends: list[tuple]) -> None:
+        """
+        Rewrite feed pages first_page..last from one ordered scan that seeks
+        past `ends` (those of the pages kept), then the page ends and the index.
+        """
+        index = {name: i for i, name in enumerate(blog_crud.BLOG_FIELDS)}
+        ends = list(ends)
+        page, batch = first_page, []
+        for row in blog_crud.iter_approved_oldest_first(db, after=ends[-1] if ends else None):
+            batch.append(row)
+            if len(batch) == self.page_size:
+                write_atomic(self._page_path(page), encode_rows(blog_crud.BLOG_FIELDS, batch[::-1]))
+                ends.append((row[index["created_at"]], row[index["id"]]))
+                page, batch = page + 1, []
+        total = len(ends) * self.page_size + len(batch)
+        if batch or page == 1:
+            write_atomic(self._page_path(page), encode_rows(blog_crud.BLOG_FIELDS, batch[::-1]))
+            page += 1
+
+        pages = page - 1
+        # drop pages left over from a longer feed
+        stale = pages + 1
+        while self._page_path(stale).exists():
+            remove(self._page_path(stale))
+            stale += 1
+
+        write_atomic(
+            self._ends_path(),
+            orjson.dumps({"page_size": self.page_size, "ends": ends}),
+            gzipped=False,
+        )
+        write_atomic(
+            self.directory / "feed" / "index.json",
+            orjson.dumps(
+                {
+                    "page_size": self.page_size,
+                    "pages": pages,
+                    "total": total,
+                    "published_at": datetime.utcnow(),
+                }
+            ),
+        )
+
+    def rebuild(self) -> int:
+        """Full rebuild: every approved blog and feed page; stale files removed."""
+        if not self.enabled:
+            return 0
+        with self._exclusive():
+            db = self.session_factory()
+            try:
+                fields = blog_crud.BLOG_FIELDS
+                id_index = fields.index("id")
+                published = set()
+                for row in blog_crud.iter_approved_oldest_first(db):
+                    write_atomic(self._blog_path(row[id_index]), encode_row(fields, row))
+                    published.add(row[id_index])
+                for path in (self.directory / "blogs").glob("*.json"):
+                    if path.stem.isdigit() and int(path.stem) not in published:
+                        remove(path)
+                self._write_pages(db, 1, [])
+            finally:
+                db.close()
+        return len(published)
+
+    async def run(self) -> None:
+        """Background time trigger; started from the app lifespan."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self.publish)
+            except Exception:
+                pass  # already logged; retried next interval
+
+    def start(self) -> None:
+        if self.enabled and self._runner is None:
+            self._runner = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+        if self.enabled:
+            await asyncio.to_thread(self.publish)
+
+
+snapshot_publisher = SnapshotPublisher(
+    settings.SNAPSHOT_DIR,
+    page_size=settings.SNAPSHOT_PAGE_SIZE,
+    flush_interval=settings.SNAPSHOT_FLUSH_SECONDS,
+)
@@ -1,11 +1,17 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
-from app.db.session import Base, get_db
+from app.db.session import Base, get_db, get_read_db, get_async_db, to_async_url
+from app import deps
+from app.deps import rate_limiter
 from app.model.user import Role
+from app.services.chat_history import chat_history
+from app.services.draft_autosave import draft_autosave
+from app.services.snapshots import snapshot_publisher
 
 
 # Use a separate SQLite DB for tests
@@ -16,6 +22,11 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(to_async_url(SQLALCHEMY_DATABASE_URL))
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def override_get_db():
     db = TestingSessionLocal()
@@ -25,8 +36,22 @@ def override_get_db():
         db.close()
 
 
-# Override the app's DB dependency
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+# Override the app's DB dependencies
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+# principal cache misses and background writers open their own sessions
+deps.principal_session_factory = TestingAsyncSessionLocal
+chat_history.session_factory = TestingSessionLocal
+draft_autosave.session_factory = TestingSessionLocal
+snapshot_publisher.session_factory = TestingSessionLocal
+# every test client shares one address; test_rate_limit turns it back on
+rate_limiter.enabled = False
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import deps
+from app.core.hashing import HashingPool, HashingPoolBusy, hash_secret, verify_and_update
+from app.tests.conftest import _register_user
+
+
+def _login(client: TestClient, username: str, password: str) -> str:
+    res = client.post("/api/auth/login", data={"username": username, "password": password})
+    assert res.status_code == 200, res.text
+    return res.json()["access_token"]
+
+
+def test_role_change_invalidates_cached_principal(client: TestClient):
+    username, password = _register_user(client, username="promoted1", password="Promote123!")
+    headers = {"Authorization": f"Bearer {_login(client, username, password)}"}
+
+    # First calls populate the principal cache with role=user
+    assert client.get("/api/auth/me", headers=headers).json()["role"] == "user"
+    assert client.get("/api/blogs/pending", headers=headers).status_code == 403
+
+    client.post(f"/api/auth/make-admin/{username}")
+
+    # Same token, new role applies immediately
+    assert client.get("/api/auth/me", headers=headers).json()["role"] == "admin"
+    assert client.get("/api/blogs/pending", headers=headers).status_code == 200
+
+
+def test_cached_principal_needs_no_database_session(client: TestClient, user_token: str, monkeypatch):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    def no_session():
+        raise AssertionError("opened a session on a principal cache hit")
+
+    monkeypatch.setattr(deps, "principal_session_factory", no_session)
+    assert client.get("/api/auth/me", headers=headers).json()["username"] == "user1"
+
+
+def test_invalid_token_rejected(client: TestClient):
+    res = client.get("/api/auth/me", headers={"Authorization": "Bearer not-a-jwt"})
+    assert res.status_code == 401
+
+
+def test_hashing_pool_sheds_load_when_saturated():
+    pool = HashingPool(workers=1, max_pending=1)
+    try:
+        running = pool.submit(time.sleep, 0.5)
+        with pytest.raises(HashingPoolBusy):
+            pool.submit(time.sleep, 0)
+        running.result()
+        # slot is released once the job finishes
+        pool.submit(time.sleep, 0).result()
+    finally:
+        pool.shutdown()
+
+
+def test_outdated_bcrypt_cost_is_rehashed():
+    old_hash = hash_secret(b"Secret123!", 4)
+    ok, new_hash = verify_and_update(b"Secret123!", old_hash, 5)
+    assert ok and new_hash and new_hash.startswith("$2b$05$")
+
+    assert verify_and_update(b"Secret123!", new_hash, 5) == (True, None)
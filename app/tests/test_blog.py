@@ -1,4 +1,12 @@
+from collections import Counter
+
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.crud import blog_crud, blog_stats_crud
+from app.model.blog import Blog, BlogStatus
+from app.tests.conftest import TestingSessionLocal
 
 
 def test_create_blog_pending_status(client: TestClient, user_token: str):
@@ -56,3 +64,350 @@ def test_admin_can_approve_blog(client: TestClient, user_token: str, admin_token
     assert res_public.status_code == 200
     public_ids = [b["id"] for b in res_public.json()]
     assert blog_id in public_ids
+
+
+def test_public_blogs_cursor_pagination(client: TestClient, user_token: str, admin_token: str):
+    created_ids = []
+    for i in range(5):
+        res = client.post(
+            "/api/blogs/",
+            headers={"Authorization": f"Bearer {user_token}"},
+            json={"title": f"Paged Blog {i}", "content": "page me"},
+        )
+        assert res.status_code == 201, res.text
+        blog_id = res.json()["id"]
+        res_approve = client.post(
+            f"/api/blogs/{blog_id}/approve",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        assert res_approve.status_code == 200, res_approve.text
+        created_ids.append(blog_id)
+
+    # Walk the whole feed two items at a time
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        res = client.get("/api/blogs/", params=params)
+        assert res.status_code == 200, res.text
+        page = res.json()
+        assert len(page) <= 2
+        seen.extend(b["id"] for b in page)
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert set(created_ids) <= set(seen)
+    # newest first
+    assert [i for i in seen if i in created_ids] == sorted(created_ids, reverse=True)
+
+    res_bad = client.get("/api/blogs/", params={"cursor": "not-a-cursor"})
+    assert res_bad.status_code == 400
+
+    # a front end on another origin can read the cursor
+    res_cors = client.get("/api/blogs/", params={"limit": 1}, headers={"Origin": "https://front.example"})
+    assert "x-next-cursor" in res_cors.headers["Access-Control-Expose-Headers"].lower()
+
+
+def test_public_blog_conditional_get(client: TestClient, user_token: str, admin_token: str):
+    res = client.post(
+        "/api/blogs/",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"title": "Cached Blog", "content": "etag me"},
+    )
+    blog_id = res.json()["id"]
+    client.post(f"/api/blogs/{blog_id}/approve", headers={"Authorization": f"Bearer {admin_token}"})
+
+    res_list = client.get("/api/blogs/")
+    etag = res_list.headers["ETag"]
+    # the feed's newest updated_at can go back (reject / delete), so no Last-Modified
+    assert "Last-Modified" not in res_list.headers
+
+    res_304 = client.get("/api/blogs/", headers={"If-None-Match": etag})
+    assert res_304.status_code == 304
+    assert res_304.content == b""
+
+    res_one = client.get(f"/api/blogs/{blog_id}")
+    res_one_304 = client.get(
+        f"/api/blogs/{blog_id}",
+        headers={"If-Modified-Since": res_one.headers["Last-Modified"]},
+    )
+    assert res_one_304.status_code == 304
+
+    # Rejecting the blog changes the feed, so the old ETag no longer matches
+    client.post(f"/api/blogs/{blog_id}/reject", headers={"Authorization": f"Bearer {admin_token}"})
+    res_after = client.get("/api/blogs/", headers={"If-None-Match": etag})
+    assert res_after.status_code == 200
+    assert all(b["id"] != blog_id for b in res_after.json())
+
+
+def test_feed_page_is_never_served_under_a_newer_etag(client: TestClient, user_token: str, admin_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    blog = client.post("/api/blogs/", headers=headers, json={"title": "Other worker", "content": "x"}).json()
+    blog_id = blog["id"]
+    before = client.get("/api/blogs/", params={"limit": 100})
+
+    # approved behind this process's back (another worker): no cache invalidation here
+    db = TestingSessionLocal()
+    try:
+        db.query(Blog).filter(Blog.id == blog_id).update({Blog.status: BlogStatus.approved})
+        deltas = blog_stats_crud.change(Counter(), blog["author_id"], BlogStatus.pending, BlogStatus.approved)
+        blog_stats_crud.apply(db, deltas)
+        db.commit()
+    finally:
+        db.close()
+
+    after = client.get("/api/blogs/", params={"limit": 100})
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert blog_id in [b["id"] for b in after.json()]
+
+
+def test_search_only_returns_approved_blogs(client: TestClient, user_token: str, admin_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+
+    approved_id = client.post(
+        "/api/blogs/", headers=headers, json={"title": "Zebra migration", "content": "Herds crossing rivers"}
+    ).json()["id"]
+    pending_id = client.post(
+        "/api/blogs/", headers=headers, json={"title": "Zebra stripes", "content": "Still pending"}
+    ).json()["id"]
+    client.post(f"/api/blogs/{approved_id}/approve", headers=admin)
+
+    res = client.get("/api/blogs/search", params={"q": "zebra"})
+    assert res.status_code == 200, res.text
+    hits = res.json()
+    assert [h["id"] for h in hits] == [approved_id]
+    assert "[Zebra]" in hits[0]["snippet"]
+
+    # content matches too, and the index follows status changes
+    assert [h["id"] for h in client.get("/api/blogs/search", params={"q": "rivers"}).json()] == [approved_id]
+    client.post(f"/api/blogs/{approved_id}/reject", headers=admin)
+    assert client.get("/api/blogs/search", params={"q": "zebra"}).json() == []
+    assert pending_id not in [h["id"] for h in client.get("/api/blogs/search", params={"q": "stripes"}).json()]
+
+    # FTS syntax in user input is treated as plain words
+    assert client.get("/api/blogs/search", params={"q": 'zebra" OR (*'}).status_code == 200
+
+
+def test_search_pages_by_rank_cursor(client: TestClient, user_token: str, admin_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    # two rank ties (same text), so the rowid tiebreak matters
+    contents = ["okapi", "okapi okapi", "okapi", "okapi okapi okapi", "okapi"]
+    ids = [
+        client.post("/api/blogs/", headers=headers, json={"title": f"Forest {i}", "content": text}).json()["id"]
+        for i, text in enumerate(contents)
+    ]
+    client.post("/api/blogs/moderate", headers=admin, json={"ids": ids, "action": "approve"})
+
+    everything = [h["id"] for h in client.get("/api/blogs/search", params={"q": "okapi", "limit": 100}).json()]
+    assert sorted(everything) == sorted(ids)
+
+    paged, cursor = [], None
+    while True:
+        params = {"q": "okapi", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        res = client.get("/api/blogs/search", params=params)
+        paged += [h["id"] for h in res.json()]
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert paged == everything
+
+    assert client.get("/api/blogs/search", params={"q": "okapi", "cursor": "bogus"}).status_code == 400
+
+
+def test_bulk_moderation(client: TestClient, user_token: str, admin_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    ids = [
+        client.post("/api/blogs/", headers=headers, json={"title": f"Bulk {i}", "content": "x"}).json()["id"]
+        for i in range(3)
+    ]
+    client.post(f"/api/blogs/{ids[0]}/approve", headers=admin)
+
+    res = client.post(
+        "/api/blogs/moderate",
+        headers=admin,
+        json={"ids": ids + [999999], "action": "approve"},
+    )
+    assert res.status_code == 200, res.text
+    results = {r["id"]: r["result"] for r in res.json()}
+    assert results == {ids[0]: "unchanged", ids[1]: "approved", ids[2]: "approved", 999999: "not_found"}
+
+    public_ids = {b["id"] for b in client.get("/api/blogs/", params={"limit": 100}).json()}
+    assert set(ids) <= public_ids
+
+    # regular users can't moderate
+    assert client.post("/api/blogs/moderate", headers=headers, json={"ids": ids, "action": "reject"}).status_code == 403
+
+
+def test_blog_stats_counters(client: TestClient, user_token: str, admin_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    before = client.get("/api/blogs/stats", headers=admin).json()
+
+    created = [
+        client.post("/api/blogs/", headers=headers, json={"title": f"Stats {i}", "content": "x"}).json()
+        for i in range(4)
+    ]
+    ids = [b["id"] for b in created]
+    author_id = created[0]["author_id"]
+
+    client.post(f"/api/blogs/{ids[0]}/approve", headers=admin)
+    client.post(f"/api/blogs/{ids[1]}/reject", headers=admin)
+    client.post("/api/blogs/moderate", headers=admin, json={"ids": [ids[0], ids[2]], "action": "reject"})
+    client.delete(f"/api/blogs/{ids[3]}", headers=headers)
+
+    after = client.get("/api/blogs/stats", headers=admin).json()
+    assert after["pending"] == before["pending"]
+    assert after["approved"] == before["approved"]
+    assert after["rejected"] == before["rejected"] + 3
+
+    zero = {"pending": 0, "approved": 0, "rejected": 0}
+    mine_before = next((a for a in before["authors"] if a["author_id"] == author_id), zero)
+    mine_after = next(a for a in after["authors"] if a["author_id"] == author_id)
+    assert mine_after["rejected"] == mine_before["rejected"] + 3
+    assert mine_after["pending"] == mine_before["pending"]
+
+    assert client.get("/api/blogs/stats", headers=headers).status_code == 403
+
+
+def test_racing_moderators_move_the_counters_once(client: TestClient, user_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    blog_id = client.post("/api/blogs/", headers=headers, json={"title": "Race", "content": "x"}).json()["id"]
+
+    first, second = TestingSessionLocal(), TestingSessionLocal()
+    try:
+        # both moderators loaded the blog while it was still pending
+        blogs = [blog_crud.get_blog(db, blog_id) for db in (first, second)]
+        approved = blog_stats_crud.total(first, BlogStatus.approved)
+        pending = blog_stats_crud.total(first, BlogStatus.pending)
+
+        blog_crud.approve_blog(first, blogs[0])
+        assert blog_crud.approve_blog(second, blogs[1]).status == BlogStatus.approved
+
+        assert blog_stats_crud.total(first, BlogStatus.approved) == approved + 1
+        assert blog_stats_crud.total(first, BlogStatus.pending) == pending - 1
+    finally:
+        first.close()
+        second.close()
+
+
+def test_delete_counts_the_status_the_blog_had_when_deleted(client: TestClient, user_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    blog_id = client.post("/api/blogs/", headers=headers, json={"title": "Doomed", "content": "x"}).json()["id"]
+
+    author, moderator = TestingSessionLocal(), TestingSessionLocal()
+    try:
+        # the author loaded it while pending, then it was approved
+        blog = blog_crud.get_blog(author, blog_id)
+        blog_crud.approve_blog(moderator, blog_crud.get_blog(moderator, blog_id))
+        approved = blog_stats_crud.total(moderator, BlogStatus.approved)
+        pending = blog_stats_crud.total(moderator, BlogStatus.pending)
+
+        blog_crud.delete_blog(author, blog)
+
+        assert blog_stats_crud.total(moderator, BlogStatus.approved) == approved - 1
+        assert blog_stats_crud.total(moderator, BlogStatus.pending) == pending
+    finally:
+        author.close()
+        moderator.close()
+
+
+def test_fast_list_encoding_matches_schema(client: TestClient, user_token: str, admin_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    blog_id = client.post("/api/blogs/", headers=headers, json={"title": "Encoded", "content": "é ✓"}).json()["id"]
+
+    pending = client.get("/api/blogs/pending", headers=admin, params={"limit": 100}).json()
+    assert next(b for b in pending if b["id"] == blog_id)["status"] == "pending"
+
+    client.post(f"/api/blogs/{blog_id}/approve", headers=admin)
+    listed = next(b for b in client.get("/api/blogs/", params={"limit": 100}).json() if b["id"] == blog_id)
+    # the list is encoded straight from row tuples; the detail goes through BlogOut
+    assert listed == client.get(f"/api/blogs/{blog_id}").json()
+
+
+def test_sparse_fieldsets_skip_content(client: TestClient, user_token: str, admin_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    content = "word " * 100
+    ids = [
+        client.post("/api/blogs/", headers=headers, json={"title": f"Card {i}", "content": content}).json()["id"]
+        for i in range(3)
+    ]
+    client.post("/api/blogs/moderate", headers=admin, json={"ids": ids, "action": "approve"})
+
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        res = client.get("/api/blogs/", params={"fields": "title,excerpt", "limit": 2})
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+    assert res.status_code == 200
+    page = res.json()
+    assert [set(blog) for blog in page] == [{"title", "excerpt"}] * 2
+    assert page[0]["title"] == "Card 2"
+    # stored excerpt: collapsed, cut on a word, with an ellipsis
+    assert page[0]["excerpt"].endswith("word…") and len(page[0]["excerpt"]) <= 201
+    listing = [s for s in statements if "FROM blogs" in s and "LIMIT" in s]
+    assert listing and all("blogs.content" not in s for s in listing)
+
+    # the cursor still works although created_at / id weren't requested
+    res = client.get(
+        "/api/blogs/",
+        params={"fields": "id", "limit": 2, "cursor": res.headers["X-Next-Cursor"]},
+    )
+    assert res.json()[0] == {"id": ids[0]}
+
+    assert client.get("/api/blogs/", params={"fields": "title,secret"}).status_code == 400
+    pending = client.get("/api/blogs/pending", headers=admin, params={"fields": "id,status"})
+    assert all(set(blog) == {"id", "status"} for blog in pending.json())
+
+
+def test_blog_lists_embed_author_in_constant_queries(client: TestClient, user_token: str, admin_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    # two authors, so the page mixes them
+    ids = [
+        client.post("/api/blogs/", headers=headers if i % 2 else admin, json={"title": f"A{i}", "content": "x"}).json()["id"]
+        for i in range(140)
+    ]
+    client.post("/api/blogs/moderate", headers=admin, json={"ids": ids[:100], "action": "approve"})
+
+    def count_queries(url, **kwargs):
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        blog_crud.feed_cache.clear()
+        event.listen(Engine, "before_cursor_execute", capture)
+        try:
+            res = client.get(url, **kwargs)
+        finally:
+            event.remove(Engine, "before_cursor_execute", capture)
+        assert res.status_code == 200, res.text
+        return len(statements), res.json()
+
+    small, _ = count_queries("/api/blogs/", params={"limit": 5})
+    queries, page = count_queries("/api/blogs/", params={"limit": 100})
+    assert len(page) == 100
+    assert queries == small
+    assert {blog["author_username"] for blog in page if blog["id"] in ids} == {"user1", "admin1"}
+
+    small, _ = count_queries("/api/blogs/pending", headers=admin, params={"limit": 5})
+    queries, page = count_queries("/api/blogs/pending", headers=admin, params={"limit": 100})
+    assert len(page) >= 40
+    assert queries == small
+
+    detail = client.get(f"/api/blogs/{ids[1]}").json()
+    assert detail["author_username"] == "user1"
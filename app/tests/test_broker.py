@@ -0,0 +1,31 @@
+import asyncio
+
+from app.services.broker import BrokerHub, UnixSocketBroker
+from app.services.notifications import NotificationManager
+
+
+def test_unix_socket_broker_fans_out_across_clients(tmp_path):
+    async def scenario():
+        path = str(tmp_path / "hub.sock")
+        hub = BrokerHub(path)
+        await hub.start()
+
+        # two "workers", each with its own broker client and notifier
+        workers = [UnixSocketBroker(path), UnixSocketBroker(path)]
+        notifiers = [NotificationManager(b) for b in workers]
+        for b in workers:
+            await b.start()
+        await asyncio.sleep(0.1)  # let the clients connect
+        subscribers = [await n.connect() for n in notifiers]
+
+        await notifiers[0].publish({"type": "blog_pending", "blog_id": 1})
+
+        received = [await n.next_events(s, timeout=1.0) for n, s in zip(notifiers, subscribers)]
+        for b in workers:
+            await b.stop()
+        await hub.stop()
+        return received
+
+    first, second = asyncio.run(scenario())
+    assert first == second
+    assert [event for _, event in first] == [{"type": "blog_pending", "blog_id": 1}]
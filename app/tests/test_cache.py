@@ -0,0 +1,28 @@
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache_lru_eviction_and_stats():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 1, "evictions": 1}
+
+
+def test_ttl_cache_expiry_and_stale_writes():
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+    # a value loaded before an invalidation must not be cached after it
+    generation = cache.generation
+    cache.pop("a")
+    assert cache.set("a", "stale", generation=generation) is False
+    assert cache.get("a") is None
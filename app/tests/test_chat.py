@@ -0,0 +1,134 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.services.chat import CLOSE_TOO_SLOW, BlogChatManager
+from app.services.chat_history import ChatHistory, chat_history
+from app.tests.conftest import _register_user
+
+
+class _FakeWebSocket:
+    def __init__(self, stalled: bool = False) -> None:
+        self.stalled = stalled
+        self.received: list[str] = []
+        self.close_code: int | None = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, message: str) -> None:
+        if self.stalled:
+            await asyncio.sleep(3600)
+        self.received.append(message)
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+
+
+def test_slow_client_is_evicted_without_delaying_the_room():
+    async def scenario():
+        manager = BlogChatManager(max_lag=2)
+        fast, slow = _FakeWebSocket(), _FakeWebSocket(stalled=True)
+        await manager.connect(1, fast)
+        await manager.connect(1, slow)
+
+        for i in range(5):
+            await manager.broadcast(1, f"msg {i}")
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+
+        assert fast.received == [f"msg {i}" for i in range(5)]
+        assert slow.close_code == CLOSE_TOO_SLOW
+        assert manager.room_sizes() == {1: 1}
+
+    asyncio.run(scenario())
+
+
+def test_chat_broadcast_over_websocket(client: TestClient, user_token: str):
+    res = client.post(
+        "/api/blogs/",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"title": "Chat room", "content": "talk here"},
+    )
+    blog_id = res.json()["id"]
+
+    url = f"/api/blogs/{blog_id}/ws?token={user_token}"
+    with client.websocket_connect(url) as first, client.websocket_connect(url) as second:
+        first.send_text("hello")
+        assert first.receive_text() == "user1: hello"
+        assert second.receive_text() == "user1: hello"
+
+
+def test_chat_history_and_tail_replay(client: TestClient, user_token: str):
+    res = client.post(
+        "/api/blogs/",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"title": "History room", "content": "talk here"},
+    )
+    blog_id = res.json()["id"]
+    url = f"/api/blogs/{blog_id}/ws?token={user_token}"
+    # start from an empty buffer, so nothing triggers a flush mid-test
+    asyncio.run(chat_history.flush())
+
+    with client.websocket_connect(url) as ws:
+        for i in range(3):
+            ws.send_text(f"message {i}")
+            ws.receive_text()
+
+    # a late joiner gets the recent messages from memory
+    with client.websocket_connect(url) as late:
+        assert [late.receive_text() for _ in range(3)] == [f"user1: message {i}" for i in range(3)]
+
+    headers = {"Authorization": f"Bearer {user_token}"}
+    page = client.get(f"/api/blogs/{blog_id}/chat", params={"limit": 2}, headers=headers).json()
+    # not written yet: served from the buffer, without forcing a flush
+    assert [m["body"] for m in page] == ["message 2", "message 1"]
+    assert page[0]["id"] is None
+
+    asyncio.run(chat_history.flush())
+    page = client.get(f"/api/blogs/{blog_id}/chat", params={"limit": 2}, headers=headers).json()
+    assert [m["body"] for m in page] == ["message 2", "message 1"]
+
+    older = client.get(
+        f"/api/blogs/{blog_id}/chat", params={"before": page[-1]["id"]}, headers=headers
+    ).json()
+    assert [m["body"] for m in older] == ["message 0"]
+
+
+def test_chat_history_of_an_invisible_blog_is_404(client: TestClient, user_token: str):
+    res = client.post(
+        "/api/blogs/",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"title": "Private room", "content": "still pending"},
+    )
+    blog_id = res.json()["id"]
+
+    username, password = _register_user(client, username="outsider1", password="Outsider123!")
+    token = client.post("/api/auth/login", data={"username": username, "password": password})
+    headers = {"Authorization": f"Bearer {token.json()['access_token']}"}
+    assert client.get(f"/api/blogs/{blog_id}/chat", headers=headers).status_code == 404
+    assert client.get("/api/blogs/999999/chat", headers=headers).status_code == 404
+
+
+def test_failing_chat_batch_is_set_aside_after_max_attempts():
+    class BrokenSession:
+        def __enter__(self):
+            raise RuntimeError("database is locked")
+
+        def __exit__(self, *exc):
+            return False
+
+    async def scenario():
+        history = ChatHistory(max_attempts=2)
+        history.session_factory = BrokenSession
+        history.record(1, 1, "user1", "lost")
+        await history.flush()
+        history.record(1, 1, "user1", "next")
+        # the failed batch is retried alone, and still readable meanwhile
+        assert [m["body"] for m in history.recent(1, 10)] == ["next", "lost"]
+
+        await history.flush()
+        assert [[m["body"] for m in batch] for batch in history.failed] == [["lost"]]
+        assert [m["body"] for m in history.recent(1, 10)] == ["next"]
+
+    asyncio.run(scenario())
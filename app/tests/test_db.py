@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import deps
+from app.crud import blog_crud
+from app.db.schema import ensure_schema
+from app.db.session import (
+    RoutingSession,
+    apply_pragmas,
+    get_async_db,
+    get_db,
+    get_read_db,
+    make_engine,
+    sqlite_pragmas,
+    to_async_url,
+)
+from app.main import app
+from app.model.blog import BlogStatus
+from app.model.blog_stats import BlogStatusCount
+
+
+def test_production_sqlite_profile(tmp_path):
+    url = f"sqlite:///{tmp_path}/prod.db"
+    writer = make_engine(url, profile="production")
+    reader = make_engine(url, read_only=True, profile="production")
+    try:
+        with writer.begin() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+        # one serialized writer connection
+        assert writer.pool.size() == 1
+
+        with reader.connect() as conn:
+            assert conn.execute(text("SELECT x FROM t")).scalar() == 1
+            with pytest.raises(OperationalError, match="readonly"):
+                conn.execute(text("INSERT INTO t VALUES (2)"))
+    finally:
+        writer.dispose()
+        reader.dispose()
+
+
+def test_routing_session_holds_the_writer_only_while_writing(tmp_path):
+    url = f"sqlite:///{tmp_path}/prod.db"
+    writer = make_engine(url, profile="production")
+    reader = make_engine(url, read_only=True, profile="production")
+    BlogStatusCount.__table__.create(writer)
+    db = RoutingSession(writer=writer, reader=reader)
+    try:
+        # reads never take the writer (or its BEGIN IMMEDIATE)
+        assert db.query(BlogStatusCount).count() == 0
+        assert writer.pool.checkedout() == 0
+
+        db.add(BlogStatusCount(author_id=1, status=BlogStatus.pending, count=1))
+        db.flush()
+        # from the first write on, reads see it on the writer
+        assert db.query(BlogStatusCount).count() == 1
+        assert writer.pool.checkedout() == 1
+
+        db.commit()
+        assert writer.pool.checkedout() == 0
+        # reads after the commit are back on the reader
+        assert db.query(BlogStatusCount.count).scalar() == 1
+        assert writer.pool.checkedout() == 0
+    finally:
+        db.close()
+        writer.dispose()
+        reader.dispose()
+
+
+@pytest.fixture
+def production_client(tmp_path, monkeypatch):
+    """The API on a fresh database with the production SQLite profile wired as in app.db."""
+    url = f"sqlite:///{tmp_path}/prod.db"
+    writer = make_engine(url, profile="production")
+    reader = make_engine(url, read_only=True, profile="production")
+    async_engine = create_async_engine(to_async_url(url))
+    apply_pragmas(async_engine.sync_engine, sqlite_pragmas(read_only=True))
+    ensure_schema(writer)
+
+    session_factory = sessionmaker(class_=RoutingSession, writer=writer, reader=reader, autoflush=False)
+    read_session_factory = sessionmaker(bind=reader, autoflush=False)
+    async_session_factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    def override_get_read_db():
+        with read_session_factory() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    monkeypatch.setitem(app.dependency_overrides, get_read_db, override_get_read_db)
+    monkeypatch.setitem(app.dependency_overrides, get_async_db, override_get_async_db)
+    monkeypatch.setattr(deps, "principal_session_factory", async_session_factory)
+    # ids and usernames repeat across databases
+    for cache in (deps.principal_cache, blog_crud.blog_cache, blog_crud.feed_cache):
+        cache.clear()
+    yield TestClient(app)
+    for cache in (deps.principal_cache, blog_crud.blog_cache, blog_crud.feed_cache):
+        cache.clear()
+    writer.dispose()
+    reader.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+def test_api_under_the_production_profile(production_client: TestClient):
+    client = production_client
+    for username in ("writer1", "moderator1"):
+        payload = {"username": username, "email": f"{username}@example.com", "password": "Secret123!"}
+        assert client.post("/api/auth/register", json=payload).status_code == 201
+    assert client.post("/api/auth/make-admin/moderator1").status_code == 200
+
+    def login(username):
+        res = client.post("/api/auth/login", data={"username": username, "password": "Secret123!"})
+        assert res.status_code == 200, res.text
+        return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+    author, admin = login("writer1"), login("moderator1")
+    ids = [
+        client.post("/api/blogs/", headers=author, json={"title": f"Prod {i}", "content": "x"}).json()["id"]
+        for i in range(3)
+    ]
+    assert client.put(f"/api/blogs/{ids[0]}", headers=author, json={"title": "Prod edited"}).status_code == 200
+    assert client.post(f"/api/blogs/{ids[0]}/approve", headers=admin).status_code == 200
+    res = client.post("/api/blogs/moderate", headers=admin, json={"ids": ids[1:], "action": "reject"})
+    assert res.status_code == 200, res.text
+    assert client.delete(f"/api/blogs/{ids[2]}", headers=author).status_code == 204
+
+    assert [b["title"] for b in client.get("/api/blogs/").json()] == ["Prod edited"]
+    stats = client.get("/api/blogs/stats", headers=admin).json()
+    assert (stats["pending"], stats["approved"], stats["rejected"]) == (0, 1, 1)
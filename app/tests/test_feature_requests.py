@@ -0,0 +1,62 @@
+from fastapi.testclient import TestClient
+
+
+def _pages(client: TestClient, headers: dict, params: dict) -> list[dict]:
+    items, cursor = [], None
+    while True:
+        res = client.get(
+            "/api/feature-requests/",
+            headers=headers,
+            params={**params, **({"cursor": cursor} if cursor else {})},
+        )
+        assert res.status_code == 200, res.text
+        items += res.json()
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            return items
+
+
+def test_feature_request_filters_sorting_and_pagination(
+    client: TestClient, user_token: str, admin_token: str
+):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+
+    created = [
+        client.post(
+            "/api/feature-requests/",
+            headers=headers,
+            json={"title": f"FR {p}", "description": "d", "priority": p},
+        ).json()
+        for p in (3, 1, 5, 3, 4)
+    ]
+    user_id = created[0]["user_id"]
+    for fr, rating in zip(created[:3], (2, 9, 7)):
+        client.patch(
+            f"/api/feature-requests/{fr['id']}",
+            headers=admin,
+            json={"status": "accepted", "rating": rating},
+        )
+    ids = {fr["id"] for fr in created}
+
+    by_priority = [
+        fr for fr in _pages(client, headers, {"sort": "priority", "limit": 2, "user_id": user_id})
+        if fr["id"] in ids
+    ]
+    assert [fr["priority"] for fr in by_priority] == [5, 4, 3, 3, 1]
+    # ties on priority: newest first
+    assert by_priority[2]["id"] > by_priority[3]["id"]
+
+    accepted = _pages(
+        client, headers, {"status": "accepted", "sort": "rating", "limit": 1, "min_priority": 1}
+    )
+    assert [fr["rating"] for fr in accepted if fr["id"] in ids] == [9, 7, 2]
+
+    ranged = _pages(client, headers, {"min_priority": 3, "max_priority": 4, "min_rating": 1})
+    assert {fr["id"] for fr in ranged} & ids == {created[0]["id"]}
+
+    # a cursor only works with the sort it was issued for
+    res = client.get("/api/feature-requests/", headers=headers, params={"sort": "priority", "limit": 1})
+    cursor = res.headers["X-Next-Cursor"]
+    res = client.get("/api/feature-requests/", headers=headers, params={"sort": "rating", "cursor": cursor})
+    assert res.status_code == 400
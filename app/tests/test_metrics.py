@@ -0,0 +1,45 @@
+from app.core.metrics import Histogram, request_sql_statements, requests_total
+
+
+def _sample(text: str, prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{prefix} not in metrics output")
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "/x")
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/x",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/x"} 4' in lines
+
+
+def test_metrics_per_route_template(client):
+    route = "/api/blogs/{blog_id}"
+    before = requests_total.value("GET", route, "404")
+    queries_before = request_sql_statements.count("GET", route)
+
+    for blog_id in (999991, 999992):
+        assert client.get(f"/api/blogs/{blog_id}").status_code == 404
+
+    # labelled by template, not by the concrete path
+    assert requests_total.value("GET", route, "404") == before + 2
+    assert request_sql_statements.count("GET", route) == queries_before + 2
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = res.text
+    assert "/api/blogs/999991" not in text
+    # the 404 path still ran its SELECT, from the threadpool
+    assert _sample(text, f'http_request_sql_statements_sum{{method="GET",route="{route}"}}') >= 2
+    # the scrape itself is in flight while it renders
+    assert _sample(text, "http_requests_in_flight") == 1
+    assert _sample(text, "sse_subscribers") == 0
+    assert 'cache_events_total{cache="blog",event="misses"}' in text
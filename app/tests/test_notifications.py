@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from app.services.notifications import NotificationManager, SubscriberLagged
+
+
+def test_replay_from_last_event_id():
+    async def scenario():
+        manager = NotificationManager(buffer_size=10)
+        for i in range(3):
+            await manager.publish({"n": i})
+
+        # reconnect after having seen event 1
+        subscriber = await manager.connect(last_event_id=1)
+        events = await manager.next_events(subscriber, timeout=0.01)
+        assert [event_id for event_id, _ in events] == [2, 3]
+        assert await manager.next_events(subscriber, timeout=0.01) == []
+
+    asyncio.run(scenario())
+
+
+def test_lagging_subscriber_is_skipped_ahead_or_disconnected():
+    async def scenario(policy):
+        manager = NotificationManager(buffer_size=3, lag_policy=policy)
+        subscriber = await manager.connect()
+        assert await manager.next_events(subscriber, timeout=0.01) == []
+        for i in range(5):
+            await manager.publish({"n": i})
+        return await manager.next_events(subscriber, timeout=0.01)
+
+    events = asyncio.run(scenario("drop"))
+    assert events[0][1] == {"type": "events_dropped", "missed": 2}
+    assert [event_id for event_id, _ in events[1:]] == [3, 4, 5]
+
+    with pytest.raises(SubscriberLagged):
+        asyncio.run(scenario("disconnect"))
@@ -0,0 +1,88 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core import ratelimit
+from app.core.ratelimit import RateLimit, TokenBucketLimiter
+from app.deps import CHAT_PER_USER, REGISTER_PER_IP, rate_limiter
+
+
+@pytest.fixture
+def limited():
+    rate_limiter.reset()
+    rate_limiter.enabled = True
+    yield rate_limiter
+    rate_limiter.enabled = False
+    rate_limiter.reset()
+
+
+def test_token_bucket_burst_refill_and_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(shards=1, max_keys=4)
+    limit = RateLimit.parse("2/second")
+    assert limit == RateLimit(2, 1.0)
+
+    assert limiter.hit("a", limit) == 0
+    assert limiter.hit("a", limit) == 0
+    assert limiter.hit("a", limit) == pytest.approx(0.5)
+    now[0] += 0.5
+    assert limiter.hit("a", limit) == 0
+
+    # idle buckets are full again, so they are dropped on a later sweep
+    now[0] += limiter.SWEEP_INTERVAL
+    limiter.hit("b", limit)
+    assert len(limiter) == 1
+
+    # more live keys than max_keys: the oldest are forgotten
+    for key in range(20):
+        limiter.hit(key, limit)
+    assert len(limiter) <= 4
+
+    with pytest.raises(ValueError):
+        RateLimit.parse("10/fortnight")
+
+
+def test_full_shard_evicts_the_least_recently_used_bucket(monkeypatch):
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: 1000.0)
+    limiter = TokenBucketLimiter(shards=1, max_keys=2)
+    limit = RateLimit.parse("1/minute")
+
+    assert limiter.hit("a", limit) == 0
+    assert limiter.hit("b", limit) == 0
+    # a rejected check still counts as use
+    assert limiter.hit("a", limit) > 0
+    assert limiter.hit("c", limit) == 0
+
+    # "b" was evicted and starts full again; "a" is still spent
+    assert len(limiter) == 2
+    assert limiter.hit("a", limit) > 0
+    assert limiter.hit("b", limit) == 0
+
+
+def test_register_is_limited_per_ip(client: TestClient, limited):
+    payload = {"username": "user1", "email": "user1@example.com", "password": "Secret123!"}
+    for _ in range(REGISTER_PER_IP.capacity):
+        assert client.post("/api/auth/register", json=payload).status_code in (201, 400)
+
+    res = client.post("/api/auth/register", json=payload)
+    assert res.status_code == 429
+    assert 1 <= int(res.headers["Retry-After"]) <= REGISTER_PER_IP.period
+
+
+def test_chat_flood_closes_the_socket(client: TestClient, user_token: str, limited):
+    res = client.post(
+        "/api/blogs/",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"title": "Busy room", "content": "flood"},
+    )
+    blog_id = res.json()["id"]
+
+    with client.websocket_connect(f"/api/blogs/{blog_id}/ws?token={user_token}") as ws:
+        for i in range(CHAT_PER_USER.capacity):
+            ws.send_text(f"msg {i}")
+            assert ws.receive_text() == f"user1: msg {i}"
+        ws.send_text("one too many")
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_text()
+    assert closed.value.code == 1008
@@ -0,0 +1,154 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.crud import draft_crud
+from app.services.draft_autosave import DraftAutosave, DraftConflict, draft_autosave
+from app.tests.conftest import TestingSessionLocal
+
+
+def test_autosaves_coalesce_into_one_upsert(client: TestClient, user_token: str):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    me = client.get("/api/auth/me", headers=headers).json()
+
+    for i in range(5):
+        res = client.post("/api/session/draft", headers=headers, json={"title": "T", "content": f"v{i}"})
+        assert res.status_code == 200, res.text
+
+    # latest autosave is visible before anything is written
+    assert client.get("/api/session/draft", headers=headers).json()["content"] == "v4"
+
+    # explicit save persists it, as a single row per user
+    client.post("/api/session/draft", params={"flush": True}, headers=headers, json={"title": "T", "content": "final"})
+    assert draft_autosave.get(me["id"]) is None
+    db = TestingSessionLocal()
+    try:
+        assert draft_crud.get_draft_for_user(db, me["id"]).content == "final"
+    finally:
+        db.close()
+    assert client.get("/api/session/draft", headers=headers).json()["content"] == "final"
+
+
+def test_patch_draft_applies_edits_and_rejects_stale_revision(client: TestClient, admin_token: str):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    saved = client.post("/api/session/draft", headers=headers, json={"title": "Hello", "content": "Hello world"}).json()
+    revision = saved["revision"]
+
+    res = client.patch(
+        "/api/session/draft",
+        headers=headers,
+        json={
+            "base_revision": revision,
+            "edits": [
+                {"start": 6, "end": 11, "text": "there"},
+                {"start": 11, "end": 11, "text": "!"},
+                {"field": "title", "start": 0, "end": 0, "text": "Re: "},
+            ],
+        },
+    )
+    assert res.status_code == 200, res.text
+    assert res.json()["revision"] == revision + 1
+    assert "content" not in res.json()
+
+    draft = client.get("/api/session/draft", headers=headers).json()
+    assert (draft["title"], draft["content"]) == ("Re: Hello", "Hello there!")
+
+    stale = client.patch(
+        "/api/session/draft",
+        headers=headers,
+        json={"base_revision": revision, "edits": [{"start": 0, "end": 0, "text": "x"}]},
+    )
+    assert stale.status_code == 409
+    assert stale.json()["detail"]["revision"] == revision + 1
+
+
+def test_save_during_a_blocked_flush_builds_on_the_inflight_draft(monkeypatch):
+    autosave = DraftAutosave(flush_interval=3600)
+    autosave.session_factory = TestingSessionLocal
+    user_id = 9001
+    autosave.save(user_id, "T", "first")
+    autosave.flush()
+
+    entered, release = threading.Event(), threading.Event()
+    upsert = draft_crud.upsert_drafts
+
+    def blocking_upsert(db, rows):
+        entered.set()
+        assert release.wait(5)
+        return upsert(db, rows)
+
+    monkeypatch.setattr(draft_crud, "upsert_drafts", blocking_upsert)
+    second = autosave.save(user_id, "T", "second")
+    flusher = threading.Thread(target=autosave.flush)
+    flusher.start()
+    assert entered.wait(5)
+
+    # the row being written is still what readers and writers see
+    assert autosave.get(user_id)["content"] == "second"
+    third = autosave.patch(user_id, second["revision"], [])
+    assert third["revision"] == second["revision"] + 1
+
+    release.set()
+    flusher.join()
+    monkeypatch.setattr(draft_crud, "upsert_drafts", upsert)
+    autosave.flush()
+
+    db = TestingSessionLocal()
+    try:
+        stored = draft_crud.get_draft_for_user(db, user_id)
+        assert (stored.content, stored.revision) == ("second", third["revision"])
+    finally:
+        db.close()
+
+
+def test_failing_overdue_flush_does_not_fail_the_save(monkeypatch):
+    def broken_upsert(db, rows):
+        raise RuntimeError("database is down")
+
+    autosave = DraftAutosave(flush_interval=0)
+    autosave.session_factory = TestingSessionLocal
+    monkeypatch.setattr(draft_crud, "upsert_drafts", broken_upsert)
+    autosave.save(9002, "T", "one")
+    # the overdue flush failed; the save still succeeded and nothing is lost
+    assert autosave.save(9002, "T", "two")["revision"] == 2
+    assert autosave.get(9002)["content"] == "two"
+
+    monkeypatch.undo()
+    assert autosave.flush() == 1
+
+
+def test_save_skipped_for_a_newer_stored_revision_is_reported(client: TestClient, user_token: str):
+    # two workers, each numbering revisions from what it last saw
+    worker_a, worker_b = DraftAutosave(flush_interval=3600), DraftAutosave(flush_interval=3600)
+    worker_a.session_factory = worker_b.session_factory = TestingSessionLocal
+    user_id = 9003
+    worker_a.save(user_id, "T", "a1")
+    worker_a.flush()
+    worker_a.save(user_id, "T", "a2")
+    worker_a.save(user_id, "T", "a3")
+    assert worker_b.save(user_id, "T", "b")["revision"] == 2
+    assert worker_a.flush() == 1
+
+    try:
+        worker_b.flush([user_id])
+    except DraftConflict as exc:
+        assert exc.revision == 3
+    else:
+        raise AssertionError("the skipped save was not reported")
+    assert worker_b.discarded == 1
+    assert worker_b.get(user_id) is None
+
+    # over the API, an explicit save that loses answers 409 instead of 200
+    headers = {"Authorization": f"Bearer {user_token}"}
+    me = client.get("/api/auth/me", headers=headers).json()
+    mine = client.post("/api/session/draft", headers=headers, json={"title": "T", "content": "mine"}).json()
+    other = {"user_id": me["id"], "title": "T", "content": "other worker", "revision": mine["revision"] + 5, "updated_at": None}
+    db = TestingSessionLocal()
+    try:
+        draft_crud.upsert_drafts(db, [other])
+    finally:
+        db.close()
+    res = client.post("/api/session/draft", params={"flush": True}, headers=headers, json={"title": "T", "content": "mine"})
+    assert res.status_code == 409, res.text
+    assert res.json()["detail"]["revision"] == other["revision"]
+    assert client.get("/api/session/draft", headers=headers).json()["content"] == "other worker"
@@ -0,0 +1,68 @@
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.snapshots import snapshot_publisher
+
+
+@pytest.fixture
+def snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_publisher, "directory", tmp_path)
+    monkeypatch.setattr(snapshot_publisher, "page_size", 2)
+    snapshot_publisher.rebuild()
+    return tmp_path
+
+
+def _feed(root) -> list[dict]:
+    index = json.loads((root / "feed" / "index.json").read_bytes())
+    items = []
+    for page in range(index["pages"], 0, -1):
+        path = root / "feed" / f"page-{page}.json"
+        body = path.read_bytes()
+        assert gzip.decompress((root / "feed" / f"page-{page}.json.gz").read_bytes()) == body
+        items += json.loads(body)
+    assert len(items) == index["total"]
+    return items
+
+
+def _api_feed(client: TestClient) -> list[dict]:
+    items, cursor = [], None
+    while True:
+        res = client.get("/api/blogs/", params={"limit": 100, **({"cursor": cursor} if cursor else {})})
+        items += res.json()
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            return items
+
+
+def test_snapshots_follow_moderation(client: TestClient, user_token: str, admin_token: str, snapshots):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    assert _feed(snapshots) == _api_feed(client)
+
+    older = client.post("/api/blogs/", headers=headers, json={"title": "Snap old", "content": "x"}).json()["id"]
+    ids = [
+        client.post("/api/blogs/", headers=headers, json={"title": f"Snap {i}", "content": "x"}).json()["id"]
+        for i in range(3)
+    ]
+    client.post("/api/blogs/moderate", headers=admin, json={"ids": ids, "action": "approve"})
+    assert snapshot_publisher.publish() == 3
+
+    blog_file = snapshots / "blogs" / f"{ids[1]}.json"
+    assert json.loads(blog_file.read_bytes()) == client.get(f"/api/blogs/{ids[1]}").json()
+    assert _feed(snapshots) == _api_feed(client)
+
+    client.post(f"/api/blogs/{ids[1]}/reject", headers=admin)
+    client.delete(f"/api/blogs/{ids[2]}", headers=headers)
+    snapshot_publisher.publish()
+
+    assert not blog_file.exists()
+    assert not (snapshots / "blogs" / f"{ids[2]}.json.gz").exists()
+    assert _feed(snapshots) == _api_feed(client)
+
+    # approved late, but it sorts into an earlier page than the newest ones
+    client.post(f"/api/blogs/{older}/approve", headers=admin)
+    snapshot_publisher.publish()
+    assert _feed(snapshots) == _api_feed(client)
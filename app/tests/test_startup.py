@@ -0,0 +1,146 @@
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.crud import draft_crud
+from app.db.schema import SCHEMA_VERSION, SchemaOutdated, ensure_schema, schema_version
+from app.db.session import make_engine
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Wall-clock budget for `import app.main` in a fresh interpreter (most of it
+# is FastAPI / SQLAlchemy / pydantic themselves), and for the part spent in
+# our own modules. Override on slow machines.
+COLD_START_BUDGET_SECONDS = float(os.environ.get("COLD_START_BUDGET_SECONDS", "4.0"))
+APP_IMPORT_BUDGET_SECONDS = float(os.environ.get("APP_IMPORT_BUDGET_SECONDS", "1.0"))
+
+_PROBE = """
+import time
+started = time.perf_counter()
+import app.main
+print(time.perf_counter() - started)
+"""
+
+
+def test_import_is_fast_and_does_not_touch_the_database(tmp_path):
+    db_file = tmp_path / "cold.db"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=ROOT,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{db_file}"},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert not db_file.exists(), "importing the app must not connect to the database"
+
+    elapsed = float(proc.stdout.strip().splitlines()[-1])
+    assert elapsed < COLD_START_BUDGET_SECONDS, f"cold import took {elapsed:.2f}s"
+
+    # -X importtime lines: "import time: <self us> | <cumulative us> | <module>"
+    own = 0
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip().split(".")[0] == "app":
+            own += int(parts[0].split(":")[1])
+    assert own / 1e6 < APP_IMPORT_BUDGET_SECONDS, f"app modules took {own / 1e6:.2f}s to import"
+
+
+def test_schema_bootstrap_is_version_checked(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/boot.db")
+    try:
+        with pytest.raises(SchemaOutdated):
+            ensure_schema(engine, create=False)
+
+        ensure_schema(engine)
+        with engine.connect() as connection:
+            assert schema_version(connection) == SCHEMA_VERSION
+        # current schema: nothing to do
+        ensure_schema(engine, create=False)
+    finally:
+        engine.dispose()
+
+
+def test_upgrade_adds_and_backfills_blog_excerpt(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/v1.db")
+    try:
+        ensure_schema(engine)
+        # roll the file back to a v1 blogs table, which had no excerpt
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO users (id, username, email, password_hash, role, is_active) VALUES (1, 'u', 'u@example.com', 'x', 'user', 1)"))
+            connection.execute(text("ALTER TABLE blogs DROP COLUMN excerpt"))
+            connection.execute(text(
+                "INSERT INTO blogs (title, content, status, author_id, created_at, updated_at) "
+                "VALUES ('t', '  hello\n  world ', 'approved', 1, '2024-01-01', '2024-01-01')"
+            ))
+            connection.execute(text("PRAGMA user_version = 1"))
+
+        ensure_schema(engine)
+        with engine.connect() as connection:
+            assert schema_version(connection) == SCHEMA_VERSION
+            assert connection.execute(text("SELECT excerpt FROM blogs")).scalar() == "hello world"
+    finally:
+        engine.dispose()
+
+
+def test_upgrade_adds_draft_revision_and_one_draft_per_user(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/v2.db")
+    try:
+        ensure_schema(engine)
+        # a drafts table as the first release created it: no revision, no UNIQUE
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE drafts"))
+            connection.execute(text(
+                "CREATE TABLE drafts (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                "title TEXT, content TEXT, updated_at DATETIME NOT NULL)"
+            ))
+            connection.execute(text(
+                "INSERT INTO drafts (user_id, content, updated_at) VALUES "
+                "(1, 'old', '2024-01-01'), (1, 'new', '2024-01-02'), (2, 'only', '2024-01-01')"
+            ))
+            connection.execute(text("PRAGMA user_version = 2"))
+
+        ensure_schema(engine)
+        with Session(engine) as db:
+            draft_crud.upsert_drafts(
+                db,
+                [{"user_id": 1, "title": None, "content": "saved", "revision": 1, "updated_at": datetime(2024, 1, 3)}],
+            )
+            contents = db.execute(text("SELECT user_id, content, revision FROM drafts ORDER BY user_id")).all()
+        assert [tuple(row) for row in contents] == [(1, "saved", 1), (2, "only", 0)]
+    finally:
+        engine.dispose()
+
+
+def test_create_app_factory():
+    from app.main import create_app
+
+    client = TestClient(create_app())
+    assert client.get("/").json() == {"status": "ok"}
+
+
+def test_management_commands_under_the_production_profile(tmp_path):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'prod.db'}",
+        "SQLITE_PROFILE": "production",
+        "SNAPSHOT_DIR": str(tmp_path / "snapshots"),
+    }
+    for command in ("init-db", "rebuild-search-index", "rebuild-blog-counters", "publish-snapshots"):
+        proc = subprocess.run(
+            [sys.executable, "-m", "app.manage", command],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert proc.returncode == 0, f"{command}: {proc.stderr}"
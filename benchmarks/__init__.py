@@ -0,0 +1,4 @@
+"""
+Performance benchmarks. Not part of the pytest suite; each module is
+a script, e.g. `python -m benchmarks.chat_latency`.
+"""
@@ -0,0 +1,60 @@
+"""
+Password-verification throughput through the hashing pool.
+
+Reports logins/s for each pool size and logins/s per worker core, e.g.
+
+    python -m benchmarks.bcrypt_logins --rounds 12 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.hashing import HashingPool, hash_secret, verify_and_update
+
+
+def _logins_per_second(workers: int, rounds: int, hashed: str, logins: int) -> float:
+    pool = HashingPool(workers, max_pending=logins)
+    try:
+        pool.run(verify_and_update, b"Bench123!", hashed, rounds)  # warm up the workers
+        # many request threads waiting on a few hashing processes, like the server
+        with ThreadPoolExecutor(max_workers=32) as request_threads:
+            started = time.perf_counter()
+            results = list(
+                request_threads.map(
+                    lambda _: pool.run(verify_and_update, b"Bench123!", hashed, rounds),
+                    range(logins),
+                )
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        pool.shutdown()
+    assert all(ok for ok, _ in results)
+    return logins / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    hashed = hash_secret(b"Bench123!", args.rounds)
+    report = {"rounds": args.rounds, "cpu_count": os.cpu_count(), "runs": []}
+    for workers in args.workers:
+        rate = _logins_per_second(workers, args.rounds, hashed, args.logins)
+        cores = min(workers, os.cpu_count() or 1)
+        report["runs"].append(
+            {
+                "workers": workers,
+                "logins_per_s": round(rate, 1),
+                "logins_per_s_per_core": round(rate / cores, 1),
+            }
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Chat broadcast delivery latency for large rooms, in-process.
+
+Each room holds N fake sockets with a small send cost; a fraction of them
+are slow. For every broadcast we record, per fast socket, the time from
+broadcast() to that socket's send completing, and compare the
+queue-per-connection manager with the old one-socket-at-a-time loop:
+
+    python -m benchmarks.chat_fanout --sizes 1000 5000 --slow 0.01
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.services.chat import BlogChatManager
+from benchmarks.common import percentiles
+
+
+class BenchSocket:
+    __slots__ = ("delay", "samples", "sent_at")
+
+    def __init__(self, delay: float, samples: list[float] | None, sent_at: dict) -> None:
+        self.delay = delay
+        self.samples = samples  # None for slow sockets: we only time the fast ones
+        self.sent_at = sent_at
+
+    async def accept(self) -> None:
+        pass
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+    async def send_text(self, message: str) -> None:
+        # a real send yields to the loop; slow clients take much longer
+        await asyncio.sleep(self.delay)
+        if self.samples is not None:
+            self.samples.append(time.perf_counter() - self.sent_at[message])
+
+
+async def _legacy_broadcast(sockets: list[BenchSocket], message: str) -> None:
+    for ws in sockets:
+        await ws.send_text(message)
+
+
+async def _run(size: int, slow_fraction: float, messages: int, legacy: bool) -> dict:
+    samples: list[float] = []
+    sent_at: dict[str, float] = {}
+    slow_every = int(1 / slow_fraction) if slow_fraction else 0
+    sockets = []
+    for i in range(size):
+        if slow_every and i % slow_every == 0:
+            sockets.append(BenchSocket(0.02, None, sent_at))
+        else:
+            sockets.append(BenchSocket(0, samples, sent_at))
+
+    manager = BlogChatManager(max_lag=256)
+    if not legacy:
+        for ws in sockets:
+            await manager.connect(1, ws)
+
+    for i in range(messages):
+        message = f"m{i}"
+        sent_at[message] = time.perf_counter()
+        if legacy:
+            await _legacy_broadcast(sockets, message)
+        else:
+            await manager.broadcast(1, message)
+        await asyncio.sleep(0.005)
+
+    # let the writers drain
+    expected = messages * sum(1 for ws in sockets if ws.samples is not None)
+    while len(samples) < expected:
+        await asyncio.sleep(0.01)
+
+    for ws in sockets:
+        manager.disconnect(1, ws)
+    return percentiles(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--slow", type=float, default=0.01, help="fraction of slow sockets")
+    parser.add_argument("--messages", type=int, default=20)
+    args = parser.parse_args()
+
+    report = []
+    for size in args.sizes:
+        for legacy in (True, False):
+            result = asyncio.run(_run(size, args.slow, args.messages, legacy))
+            report.append({"room_size": size, "fanout": "sequential" if legacy else "queued", **result})
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
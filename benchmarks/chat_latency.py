@@ -0,0 +1,87 @@
+"""
+Chat round-trip latency while blogs are being created concurrently.
+
+Before the async DB layer, `create_blog` ran its INSERT on the event loop,
+so every chat message in the worker waited behind it. Run:
+
+    python -m benchmarks.chat_latency --messages 200 --writers 8
+
+and compare the `under_load` percentiles with `idle`.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+import websockets
+
+from benchmarks.common import percentiles, register_and_login, run_server
+
+
+async def _chat_round_trips(ws_url: str, count: int) -> list[float]:
+    samples = []
+    async with websockets.connect(ws_url) as ws:
+        for i in range(count):
+            started = time.perf_counter()
+            await ws.send(f"ping {i}")
+            await ws.recv()
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def _create_blogs(base_url: str, token: str, stop: asyncio.Event) -> int:
+    created = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers) as client:
+        while not stop.is_set():
+            res = await client.post(
+                "/api/blogs/", json={"title": "bench", "content": "x" * 2000}
+            )
+            res.raise_for_status()
+            created += 1
+    return created
+
+
+async def _measure(base_url: str, token: str, blog_id: int, messages: int, writers: int) -> dict:
+    ws_url = base_url.replace("http", "ws", 1) + f"/api/blogs/{blog_id}/ws?token={token}"
+    idle = await _chat_round_trips(ws_url, messages)
+
+    stop = asyncio.Event()
+    writer_tasks = [asyncio.create_task(_create_blogs(base_url, token, stop)) for _ in range(writers)]
+    started = time.perf_counter()
+    loaded = await _chat_round_trips(ws_url, messages)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    created = sum(await asyncio.gather(*writer_tasks))
+
+    return {
+        "idle": percentiles(idle),
+        "under_load": percentiles(loaded),
+        "writers": writers,
+        "blogs_created_per_s": round(created / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--writers", type=int, default=8)
+    args = parser.parse_args()
+
+    with run_server() as base_url:
+        token = register_and_login(base_url, "bench_chat")
+        res = httpx.post(
+            f"{base_url}/api/blogs/",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "chat room", "content": "room"},
+        )
+        res.raise_for_status()
+        result = asyncio.run(
+            _measure(base_url, token, res.json()["id"], args.messages, args.writers)
+        )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import contextlib
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def run_server(
+    workers: int = 1,
+    env: dict | None = None,
+    prepare: Callable[[str], None] | None = None,
+):
+    """
+    Launch `uvicorn app.main:app` against a throwaway SQLite database
+    and yield its base URL. The server is killed on exit.
+    `prepare(database_url)` runs first, e.g. to seed the database.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        database_url = f"sqlite:///{tmp}/bench.db"
+        if prepare is not None:
+            prepare(database_url)
+        server_env = {
+            **os.environ,
+            "DATABASE_URL": database_url,
+            # every client connects from 127.0.0.1
+            "RATE_LIMIT_ENABLED": "false",
+            **(env or {}),
+        }
+        proc = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", "127.0.0.1", "--port", str(port),
+                "--workers", str(workers), "--log-level", "warning",
+            ],
+            cwd=ROOT,
+            env=server_env,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            _wait_ready(base_url, proc)
+            yield base_url
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def _wait_ready(base_url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(f"{base_url}/").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("uvicorn did not become ready")
+
+
+def register_and_login(base_url: str, username: str, password: str = "Bench123!") -> str:
+    httpx.post(
+        f"{base_url}/api/auth/register",
+        json={"username": username, "email": f"{username}@example.com", "password": password},
+    )
+    res = httpx.post(
+        f"{base_url}/api/auth/login",
+        data={"username": username, "password": password},
+    )
+    res.raise_for_status()
+    return res.json()["access_token"]
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p95/p99/max of latencies given in seconds, reported in ms."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.50), 3),
+        "p95_ms": round(pick(0.95), 3),
+        "p99_ms": round(pick(0.99), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
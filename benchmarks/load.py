@@ -0,0 +1,359 @@
+"""
+End-to-end load test: REST, SSE and WebSocket chat at the same time.
+
+Seeds a synthetic dataset (benchmarks.seed), launches uvicorn on it and,
+for `--duration` seconds after a warm-up, runs concurrently:
+
+- `--concurrency` REST clients, each looping over a weighted mix of
+  public, authenticated and admin routes;
+- `--sse` admin subscribers on /api/notifications/sse, timing how long a
+  new blog takes to show up as a `blog_pending` event;
+- `--rooms` chat rooms with `--members` sockets each, one of them sending
+  every `--chat-interval` seconds, timing broadcast delivery.
+
+Prints JSON with req/s and p50/p95/p99 per route, compared against a
+stored baseline; any regression beyond `--tolerance` exits with status 1:
+
+    python -m benchmarks.load --duration 20
+    python -m benchmarks.load --duration 20 --save-baseline
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict
+from pathlib import Path
+
+import httpx
+import websockets
+
+from benchmarks.common import percentiles, run_server
+from benchmarks.seed import PASSWORD, Dataset, WORDS, admin_usernames, seed, user_usernames
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "load.json"
+
+# latencies below this are noise; a regression must also exceed it in absolute terms
+SLACK_MS = 5.0
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.started = time.perf_counter()
+
+    def record(self, route: str, seconds: float, ok: bool = True) -> None:
+        self.samples[route].append(seconds)
+        if not ok:
+            self.errors[route] += 1
+
+    def report(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            route: {
+                **percentiles(samples),
+                "rps": round(len(samples) / elapsed, 1),
+                "errors": self.errors[route],
+            }
+            for route, samples in sorted(self.samples.items())
+        }
+
+
+class Context:
+    """State shared by the clients: tokens, known ids, in-flight timings."""
+
+    def __init__(self, user_tokens: list[str], admin_tokens: list[str], blog_ids: list[int]) -> None:
+        self.user_tokens = user_tokens
+        self.admin_tokens = admin_tokens
+        self.blog_ids = blog_ids
+        self.cursors: list[str] = []
+        # blogs created during the run: id -> perf_counter at POST
+        self.created: dict[int, float] = {}
+        # (blog_id, perf_counter) of blog_pending events seen over SSE; the
+        # event usually arrives before the POST response, so matched at the end
+        self.sse_arrivals: list[tuple[int, float]] = []
+        self.to_approve: list[int] = []
+        # chat message id -> perf_counter at send
+        self.sent: dict[str, float] = {}
+
+
+async def _timed(rec: Recorder, route: str, request, ok_statuses=(200, 201, 204, 304)):
+    started = time.perf_counter()
+    try:
+        res = await request
+    except httpx.HTTPError:
+        rec.record(route, time.perf_counter() - started, ok=False)
+        return None
+    rec.record(route, time.perf_counter() - started, ok=res.status_code in ok_statuses)
+    return res
+
+
+# -------------------------
+# REST mix: (route, weight, admin?, call)
+# -------------------------
+async def _feed(c, ctx, rng, rec):
+    params = {"limit": 20}
+    if ctx.cursors and rng.random() < 0.5:
+        params["cursor"] = rng.choice(ctx.cursors)
+    res = await _timed(rec, "GET /api/blogs/", c.get("/api/blogs/", params=params))
+    if res is not None and res.headers.get("X-Next-Cursor") and len(ctx.cursors) < 200:
+        ctx.cursors.append(res.headers["X-Next-Cursor"])
+
+
+async def _blog(c, ctx, rng, rec):
+    await _timed(rec, "GET /api/blogs/{id}", c.get(f"/api/blogs/{rng.choice(ctx.blog_ids)}"))
+
+
+async def _search(c, ctx, rng, rec):
+    await _timed(rec, "GET /api/blogs/search", c.get("/api/blogs/search", params={"q": rng.choice(WORDS)}))
+
+
+async def _feature_requests(c, ctx, rng, rec):
+    params = {"sort": rng.choice(["recent", "priority", "rating"]), "limit": 20}
+    if rng.random() < 0.5:
+        params["status"] = "pending"
+    await _timed(rec, "GET /api/feature-requests/", c.get("/api/feature-requests/", params=params))
+
+
+async def _get_draft(c, ctx, rng, rec):
+    await _timed(rec, "GET /api/session/draft", c.get("/api/session/draft"))
+
+
+async def _save_draft(c, ctx, rng, rec):
+    body = {"title": "draft", "content": " ".join(rng.choices(WORDS, k=100))}
+    await _timed(rec, "POST /api/session/draft", c.post("/api/session/draft", json=body))
+
+
+async def _create_blog(c, ctx, rng, rec):
+    started = time.perf_counter()
+    res = await _timed(
+        rec, "POST /api/blogs/", c.post("/api/blogs/", json={"title": "load", "content": "x" * 500})
+    )
+    if res is not None and res.status_code == 201:
+        blog_id = res.json()["id"]
+        ctx.created[blog_id] = started
+        ctx.to_approve.append(blog_id)
+
+
+async def _pending(c, ctx, rng, rec):
+    await _timed(rec, "GET /api/blogs/pending", c.get("/api/blogs/pending"))
+
+
+async def _stats(c, ctx, rng, rec):
+    await _timed(rec, "GET /api/blogs/stats", c.get("/api/blogs/stats"))
+
+
+async def _approve(c, ctx, rng, rec):
+    if ctx.to_approve:
+        blog_id = ctx.to_approve.pop()
+        await _timed(rec, "POST /api/blogs/{id}/approve", c.post(f"/api/blogs/{blog_id}/approve"))
+
+
+MIX = [
+    (_feed, 30, False),
+    (_blog, 20, False),
+    (_search, 8, False),
+    (_feature_requests, 10, False),
+    (_get_draft, 8, False),
+    (_save_draft, 8, False),
+    (_create_blog, 6, False),
+    (_pending, 4, True),
+    (_stats, 2, True),
+    (_approve, 4, True),
+]
+
+
+async def _rest_client(base_url: str, ctx: Context, rng: random.Random, rec: Recorder, stop: asyncio.Event):
+    user = {"Authorization": f"Bearer {rng.choice(ctx.user_tokens)}"}
+    admin = {"Authorization": f"Bearer {rng.choice(ctx.admin_tokens)}"}
+    calls = [call for call, _, _ in MIX]
+    weights = [weight for _, weight, _ in MIX]
+    is_admin = {call: needs_admin for call, _, needs_admin in MIX}
+    async with httpx.AsyncClient(base_url=base_url, headers=user, timeout=30) as as_user, \
+            httpx.AsyncClient(base_url=base_url, headers=admin, timeout=30) as as_admin:
+        while not stop.is_set():
+            call = rng.choices(calls, weights)[0]
+            await call(as_admin if is_admin[call] else as_user, ctx, rng, rec)
+
+
+# -------------------------
+# SSE subscribers
+# -------------------------
+async def _sse_subscriber(base_url: str, token: str, ctx: Context, rec: Recorder):
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=None) as c:
+        async with c.stream("GET", "/api/notifications/sse") as res:
+            async for line in res.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[len("data: "):])
+                if event.get("type") == "blog_pending":
+                    ctx.sse_arrivals.append((event["blog_id"], time.perf_counter()))
+
+
+# -------------------------
+# Chat rooms
+# -------------------------
+async def _chat_member(ws_url: str, ctx: Context, rec: Recorder, ready: asyncio.Event, sender: bool,
+                       interval: float, stop: asyncio.Event, room: int):
+    async with websockets.connect(ws_url, max_queue=None) as ws:
+        ready.set()
+
+        async def send():
+            seq = 0
+            while not stop.is_set():
+                msg_id = f"{room}-{seq}"
+                ctx.sent[msg_id] = time.perf_counter()
+                await ws.send(f"bench {msg_id}")
+                seq += 1
+                await asyncio.sleep(interval)
+
+        sending = asyncio.create_task(send()) if sender else None
+        try:
+            async for message in ws:
+                # "<username>: bench <msg_id>"
+                _, _, text = message.partition(": ")
+                if text.startswith("bench "):
+                    sent = ctx.sent.get(text[len("bench "):])
+                    if sent is not None:
+                        rec.record("WS chat broadcast", time.perf_counter() - sent)
+        finally:
+            if sending:
+                sending.cancel()
+
+
+async def _login(c: httpx.AsyncClient, name: str, rec: Recorder) -> str:
+    res = await _timed(
+        rec, "POST /api/auth/login",
+        c.post("/api/auth/login", data={"username": name, "password": PASSWORD}),
+    )
+    res.raise_for_status()
+    return res.json()["access_token"]
+
+
+async def _run(base_url: str, args, dataset: Dataset) -> dict:
+    rng = random.Random(dataset.seed)
+    rec = Recorder()
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as c:
+        users = rng.sample(user_usernames(dataset), args.logins)
+        user_tokens = await asyncio.gather(*(_login(c, name, rec) for name in users))
+        admin_tokens = await asyncio.gather(*(_login(c, name, rec) for name in admin_usernames(dataset)[:4]))
+        logins = rec.report()
+        first_page = (await c.get("/api/blogs/", params={"limit": 100})).json()
+    ctx = Context(user_tokens, admin_tokens, [blog["id"] for blog in first_page])
+
+    stop = asyncio.Event()
+    tasks = [
+        asyncio.create_task(_sse_subscriber(base_url, admin_tokens[i % len(admin_tokens)], ctx, rec))
+        for i in range(args.sse)
+    ]
+    ws_base = base_url.replace("http", "ws", 1)
+    for room in range(args.rooms):
+        blog_id = ctx.blog_ids[room % len(ctx.blog_ids)]
+        for member in range(args.members):
+            ready = asyncio.Event()
+            token = user_tokens[(room + member) % len(user_tokens)]
+            tasks.append(asyncio.create_task(_chat_member(
+                f"{ws_base}/api/blogs/{blog_id}/ws?token={token}", ctx, rec, ready,
+                member == 0, args.chat_interval, stop, room,
+            )))
+            await ready.wait()
+    tasks += [
+        asyncio.create_task(_rest_client(base_url, ctx, random.Random(dataset.seed + i), rec, stop))
+        for i in range(args.concurrency)
+    ]
+
+    await asyncio.sleep(args.warmup)
+    rec.reset()
+    await asyncio.sleep(args.duration)
+    for blog_id, arrived in ctx.sse_arrivals:
+        started = ctx.created.get(blog_id)
+        if started is not None and started >= rec.started:
+            rec.record("SSE blog_pending", arrived - started)
+    routes = rec.report()
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    routes["POST /api/auth/login"] = logins["POST /api/auth/login"]
+    return routes
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Human-readable regressions of `current` vs `baseline` route stats."""
+    regressions = []
+    for route, base in baseline.items():
+        now = current.get(route)
+        if now is None:
+            regressions.append(f"{route}: missing from this run")
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            limit = base[key] * (1 + tolerance) + SLACK_MS
+            if now[key] > limit:
+                regressions.append(f"{route}: {key} {now[key]} > {limit:.1f} (baseline {base[key]})")
+        if route != "POST /api/auth/login" and now["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{route}: rps {now['rps']} < {base['rps'] * (1 - tolerance):.1f} (baseline {base['rps']})")
+        if now["errors"] > max(base["errors"], 0.01 * now["count"]):
+            regressions.append(f"{route}: {now['errors']} errors (baseline {base['errors']})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    defaults = Dataset()
+    for field, value in asdict(defaults).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=value)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--logins", type=int, default=16)
+    parser.add_argument("--sse", type=int, default=20)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--members", type=int, default=20)
+    parser.add_argument("--chat-interval", type=float, default=0.1)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+    dataset = Dataset(**{field: getattr(args, field) for field in asdict(defaults)})
+
+    config = {
+        "dataset": asdict(dataset),
+        **{key: getattr(args, key) for key in (
+            "workers", "concurrency", "logins", "sse", "rooms", "members", "chat_interval", "duration",
+        )},
+    }
+    with run_server(
+        workers=args.workers,
+        env={"SQLITE_PROFILE": "production"},
+        prepare=lambda url: seed(url, dataset),
+    ) as base_url:
+        routes = asyncio.run(_run(base_url, args, dataset))
+
+    result = {"config": config, "routes": routes}
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        result["baseline_config_matches"] = baseline["config"] == config
+        result["regressions"] = compare(routes, baseline["routes"], args.tolerance)
+
+    print(json.dumps(result, indent=2))
+    if result.get("regressions"):
+        print(f"\n{len(result['regressions'])} REGRESSION(S) vs {args.baseline}:", file=sys.stderr)
+        for line in result["regressions"]:
+            print(f"  {line}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Synthetic dataset for the load benchmark: users (with a few admins),
+blogs in every status, feature requests and drafts, bulk-inserted
+straight into a database before the server starts. Standalone:
+
+    python -m benchmarks.seed sqlite:///./bench.db --users 200 --blogs 20000
+"""
+import argparse
+import json
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.hashing import hash_secret
+from app.db.schema import upgrade_schema
+from app.db.session import make_engine
+from app.model import Blog, BlogStatus, Draft, FeatureRequest, FeatureRequestStatus, Role, User
+from app.model.blog_stats import backfill_counts
+
+PASSWORD = "Bench123!"
+ADMIN_EVERY = 20
+
+WORDS = (
+    "fastapi sqlite python async cache index query latency throughput stream "
+    "socket chat draft feature blog review approve search token worker queue"
+).split()
+
+
+@dataclass
+class Dataset:
+    users: int = 200
+    blogs: int = 20000
+    feature_requests: int = 5000
+    drafts: int = 100
+    seed: int = 42
+
+
+def username(i: int) -> str:
+    return f"{'admin' if i % ADMIN_EVERY == 0 else 'user'}{i}"
+
+
+def admin_usernames(dataset: Dataset) -> list[str]:
+    return [username(i) for i in range(dataset.users) if i % ADMIN_EVERY == 0]
+
+
+def user_usernames(dataset: Dataset) -> list[str]:
+    return [username(i) for i in range(dataset.users) if i % ADMIN_EVERY != 0]
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def seed(database_url: str, dataset: Dataset, batch_size: int = 5000) -> None:
+    rng = random.Random(dataset.seed)
+    # one hash for everyone, at the server's cost so logins don't rehash
+    password_hash = hash_secret(PASSWORD.encode("utf-8"), settings.BCRYPT_ROUNDS)
+    started = datetime.utcnow() - timedelta(days=365)
+    statuses = [BlogStatus.approved] * 6 + [BlogStatus.pending] * 3 + [BlogStatus.rejected]
+    fr_statuses = list(FeatureRequestStatus)
+
+    def chunks(rows):
+        for i in range(0, len(rows), batch_size):
+            yield rows[i:i + batch_size]
+
+    engine = make_engine(database_url, profile="default")
+    try:
+        with engine.begin() as connection:
+            upgrade_schema(connection)
+
+            connection.execute(
+                insert(User),
+                [
+                    {
+                        "id": i + 1,
+                        "username": username(i),
+                        "email": f"{username(i)}@example.com",
+                        "password_hash": password_hash,
+                        "role": Role.admin if i % ADMIN_EVERY == 0 else Role.user,
+                        "is_active": True,
+                    }
+                    for i in range(dataset.users)
+                ],
+            )
+
+            blogs = []
+            for i in range(dataset.blogs):
+                created = started + timedelta(seconds=i * 60)
+                blogs.append(
+                    {
+                        "title": _text(rng, 6),
+                        "content": _text(rng, 120),
+                        "status": rng.choice(statuses),
+                        "author_id": rng.randint(1, dataset.users),
+                        "created_at": created,
+                        "updated_at": created,
+                    }
+                )
+            for rows in chunks(blogs):
+                connection.execute(insert(Blog), rows)
+            # the counters table was created empty above
+            backfill_counts(connection)
+
+            requests = []
+            for i in range(dataset.feature_requests):
+                created = started + timedelta(seconds=i * 300)
+                status = rng.choice(fr_statuses)
+                requests.append(
+                    {
+                        "title": _text(rng, 5),
+                        "description": _text(rng, 40),
+                        "status": status,
+                        "priority": rng.randint(1, 5),
+                        "rating": rng.randint(1, 10) if status != FeatureRequestStatus.pending else None,
+                        "user_id": rng.randint(1, dataset.users),
+                        "created_at": created,
+                        "updated_at": created,
+                    }
+                )
+            for rows in chunks(requests):
+                connection.execute(insert(FeatureRequest), rows)
+
+            connection.execute(
+                insert(Draft),
+                [
+                    {
+                        "user_id": user_id,
+                        "title": _text(rng, 4),
+                        "content": _text(rng, 200),
+                        "revision": 1,
+                        "updated_at": started,
+                    }
+                    for user_id in rng.sample(range(1, dataset.users + 1), min(dataset.drafts, dataset.users))
+                ],
+            )
+    finally:
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("database_url")
+    defaults = Dataset()
+    for field, value in asdict(defaults).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=value)
+    args = parser.parse_args()
+    dataset = Dataset(**{field: getattr(args, field) for field in asdict(defaults)})
+    seed(args.database_url, dataset)
+    print(json.dumps(asdict(dataset)))
+
+
+if __name__ == "__main__":
+    main()
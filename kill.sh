@@ -2,5 +2,6 @@
 
 # stop the app running on 8020 port
 pkill -f "uvicorn app.main:app --host 0.0.0.0 --port 8020"
+pkill -f "python -m app.services.broker"
 
-echo "Blog on port 8020 has been stopped."
\ No newline at end of file
+echo "Blog on port 8020 has been stopped."
@@ -1,8 +1,26 @@
 #!/bin/bash
 
 # Load the app on 8020 port 
+# WORKERS=4 ./run.sh runs several worker processes; SSE and chat events are
+# shared between them through the local broker hub (app/services/broker.py).
+# Draft autosaves are buffered per worker, with no sticky sessions here: run a
+# single worker, or have clients save with ?flush=true, which answers 409 when
+# another worker already stored a newer draft.
+
+WORKERS=${WORKERS:-1}
+# WAL, tuned pragmas, one serialized writer + a read-only pool (app/db/session.py)
+export SQLITE_PROFILE=${SQLITE_PROFILE:-production}
+
+if [ "$WORKERS" -gt 1 ]; then
+  export BROKER_URL=${BROKER_URL:-unix:///tmp/blog_app_broker.sock}
+  echo "Starting the pub/sub hub on ${BROKER_URL}..."
+  python -m app.services.broker &
+fi
+
+# create / upgrade the schema once, before the workers start
+python -m app.manage init-db
 
 echo "Starting the blog App on port 8020..."
-uvicorn app.main:app --host 0.0.0.0 --port 8020
+uvicorn app.main:app --host 0.0.0.0 --port 8020 --workers "$WORKERS"
 
 echo "Blog is running on port 8020."